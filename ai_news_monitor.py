@@ -2,42 +2,161 @@
 # -*- coding: utf-8 -*-
 
 import json
-import requests
 import time
-from datetime import datetime, timedelta
-import openai
-import re
-import feedparser
-from bs4 import BeautifulSoup
 import hashlib
 import os
 import sys
-from urllib.parse import urljoin, urlparse
+import socket
 import logging
+import argparse
 import aiohttp
 import asyncio
+from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
+import parsing
+from url_validator import UrlValidator
+from url_canon import UrlCanonicalizer
+from http_cache import HttpCache
+from feed_discovery import FeedRegistry
+from source_schedule import SourceSchedule
+from source_watermarks import SourceWatermarks
+from source_health import SourceHealth
+from filter_pipeline import FilterPipeline, news_hashes
+from sent_news_store import SentNewsStore
+from near_duplicates import NearDuplicateIndex
+from relevance import RelevanceScorer
+from sharding import Shard, SourceStateStore, worker_name
+from delivery_targets import ORIGINAL_LANGUAGE, load_targets
+from rate_limit import HostRateLimiter
+from run_metrics import RunMetrics
+from run_budget import RunBudget
 
 # Виправлення кодування для Windows
 if sys.platform.startswith('win'):
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
-# Налаштування логування
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('./logs/ai_news.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Параметри перекладу (входять у ключ кешу перекладів)
+TRANSLATION_MODEL = "gpt-3.5-turbo"
+TRANSLATION_TEMPERATURE = 0.3
+TRANSLATION_SYSTEM_PROMPT = "Ти професійний перекладач технічних текстів. Переклади текст на українську мову, зберігаючи технічні терміни та назви продуктів. Переклад має бути природним та зрозумілим."
+TRANSLATION_USER_PROMPT = "Переклади цей текст на українську: {text}"
+
+REDDIT_HEADERS = {'User-Agent': 'AI News Monitor 1.0'}
+
+def setup_logging(log_file='./logs/ai_news.log'):
+    """Налаштування логування - у точці входу, а не під час імпорту модуля"""
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
 
 class AINewsMonitor:
-    def __init__(self):
+    def __init__(self, worker=None, workers=None):
         self.secrets, self.ai_config, self.telegram_config = self.load_config()
-        self.openai_client = openai.OpenAI(api_key=self.secrets['OPENAI']['secrets']['API_KEY'])
+        # Шардування: воркер опитує лише свої джерела (консистентне хешування URL);
+        # надіслані хеші та резерви - у спільній SQLite-базі для всіх процесів
+        self.shard = self.create_shard(worker, workers)
+        self.claim_owner = f"{socket.gethostname()}:{os.getpid()}:{self.shard.name}"
+        self.data_dir = os.path.join('./data', self.shard.name) if self.shard.enabled else './data'
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.state_store = None
+        if self.shard.enabled:
+            self.state_store = SourceStateStore(self.ai_config.get('sharding', {}).get('state_db', './data/shared_state.db'))
         self.sent_news_file = './data/sent_news.json'
         self.sent_news = self.load_sent_news()
-        
+        # Цілі розсилки: новина перекладається раз на мову і розходиться в усі цілі
+        self.targets = load_targets(self.ai_config.get('delivery_targets'), self.telegram_config)
+        self.near_duplicates = NearDuplicateIndex(self.ai_config.get('near_duplicates'),
+                                                  self.state_path('near_duplicates.json'))
+        self.relevance = RelevanceScorer(self.ai_config.get('relevance'),
+                                         self.ai_config['filter_criteria'].get('keywords', []))
+        # Новини, що пройшли фільтри, але не потрапили до відбору: повернуться наступного запуску
+        self.deferred_news = []
+        self.url_validator = UrlValidator(self.ai_config.get('url_validation'), self.state_path('url_cache.json'))
+        self.url_canon = UrlCanonicalizer(self.ai_config.get('url_canonicalization'),
+                                          self.state_path('redirect_map.json'))
+        self.host_limiter = HostRateLimiter(self.ai_config.get('rate_limits'))
+        self.parse_pool = None
+        # Довгоживучі ресурси режиму демона (open_daemon_resources); у разовому запуску - None
+        self.session = None
+        self.openai_async = None
+        self.run_stats = {'truncated': [], 'stopped_early': 0}
+        self.metrics = RunMetrics(self.metrics_settings())
+        # Дедлайн запуску; у циклі демона створюється заново
+        self.budget = RunBudget(self.ai_config.get('run_budget'))
+        self.http_cache = HttpCache(self.state_path('http_cache'), self.ai_config.get('http_cache'))
+        self.feed_registry = FeedRegistry(self.ai_config.get('feed_discovery'), self.state_path('feed_registry.json'))
+        self.source_schedule = SourceSchedule(self.ai_config.get('source_schedule'),
+                                              self.state_path('source_schedule.json'), self.state_store)
+        self.watermarks = SourceWatermarks(self.ai_config.get('watermarks'), self.state_path('watermarks.json'),
+                                           self.state_store)
+        self.source_health = SourceHealth(self.ai_config.get('source_health'), self.state_path('source_health.json'),
+                                          self.state_store)
+        # Переклад і доставка створюються при першому зверненні: запуск без нових
+        # новин не імпортує openai і не відкриває кеш перекладів
+        self._openai_client = None
+        self._translation_cache = None
+        self._batch_translator = None
+        self._telegram = None
+        self._archive = None
+    
+    def create_shard(self, worker, workers):
+        """Шард воркера: аргументи командного рядка переважають конфігурацію"""
+        settings = self.ai_config.get('sharding', {})
+        workers = workers or settings.get('workers', 1)
+        worker = settings.get('worker', 0) if worker is None else worker
+        return Shard(worker, workers, settings.get('replicas', 100))
+    
+    def state_path(self, name):
+        """Локальні кеші воркера лежать окремо - воркери не перезаписують файли один одного"""
+        return os.path.join(self.data_dir, name)
+    
+    def metrics_settings(self):
+        settings = self.ai_config.get('metrics') or {}
+        if self.shard.enabled:
+            settings = dict(settings, dir=os.path.join(settings.get('dir', './logs'), self.shard.name))
+        return settings
+    
+    @property
+    def openai_client(self):
+        if self._openai_client is None:
+            import openai
+            self._openai_client = openai.OpenAI(api_key=self.secrets['OPENAI']['secrets']['API_KEY'])
+        return self._openai_client
+    
+    @property
+    def translation_cache(self):
+        if self._translation_cache is None:
+            from translation_cache import TranslationCache
+            self._translation_cache = TranslationCache(self.ai_config.get('translation_cache'),
+                                                       self.state_path('translation_cache.db'))
+        return self._translation_cache
+    
+    @property
+    def batch_translator(self):
+        if self._batch_translator is None:
+            from batch_translator import BatchTranslator
+            self._batch_translator = BatchTranslator(
+                self.secrets['OPENAI']['secrets']['API_KEY'], self.translation_cache,
+                TRANSLATION_MODEL, TRANSLATION_TEMPERATURE, self.ai_config.get('translation')
+            )
+        return self._batch_translator
+    
+    @property
+    def telegram(self):
+        if self._telegram is None:
+            from telegram_delivery import TelegramDelivery
+            self._telegram = TelegramDelivery(
+                self.secrets['TELEGRAM']['secrets']['BOT_TOKEN'], self.telegram_config,
+                self.ai_config.get('telegram_delivery')
+            )
+        return self._telegram
+    
     def load_config(self):
         """Завантажуємо всі конфігурації"""
         # Створюємо директорії якщо вони не існують
@@ -75,227 +194,403 @@ class AINewsMonitor:
             },
             "rate_limits": {
                 "messages_per_minute": 20,
-                "delay_between_messages": 3
+                "burst": 1
             }
         }
         return secrets, ai_config, telegram_config
     
     def load_sent_news(self):
+        """Відкриваємо сховище надісланих новин (з міграцією зі старого JSON)"""
         logging.info("=== LOADING SENT NEWS ===")
-        
-        # Список можливих локацій файлу
-        locations = [
-            './data/sent_news.json',  # Artifact location
-            './data/sent_news.json',  # Git location (той самий)
-            'data/sent_news.json',    # Альтернативний шлях
-        ]
-        
-        for location in locations:
-            if os.path.exists(location):
-                logging.info(f"Found sent news file at: {location}")
-                try:
-                    with open(location, 'r') as f:
-                        data = json.load(f)
-                        logging.info(f"Successfully loaded {len(data)} sent news hashes")
-                        return data
-                except Exception as e:
-                    logging.error(f"Error reading {location}: {e}")
-            else:
-                logging.info(f"No file at: {location}")
-        
-        logging.info("No sent news found - starting with empty list")
-        return []
+        settings = self.ai_config.get('sent_news', {})
+        store = SentNewsStore(export_file=self.sent_news_file, ttl_days=settings.get('ttl_days', 90),
+                              claim_ttl_minutes=self.ai_config.get('sharding', {}).get('claim_ttl_minutes', 30))
+        logging.info(f"Sent news store has {len(store)} hashes")
+        return store
     
     def save_sent_news(self):
-        """Зберігаємо список надісланих новин"""
-        # Зберігаємо тільки останні 1000 записів
-        if len(self.sent_news) > 1000:
-            self.sent_news = self.sent_news[-1000:]
-        
-        with open(self.sent_news_file, 'w') as f:
-            json.dump(self.sent_news, f, indent=2)
+        """Видаляємо застарілі хеші та експортуємо сховище для артефакту"""
+        evicted = self.sent_news.evict()
+        if evicted:
+            logging.info(f"Evicted {evicted} expired sent news hashes")
+        self.sent_news.export()
+        self.near_duplicates.save()
+    
+    def sent_to(self, news, target):
+        return any(target.sent_key(news_hash) in self.sent_news for news_hash in news_hashes(news))
+    
+    def pending_targets(self, news):
+        """Цілі, яким новину ще не надіслано"""
+        return [target for target in self.targets if not self.sent_to(news, target)]
+    
+    def is_sent(self, news):
+        """Дублікат - лише якщо новину вже отримали всі цілі"""
+        return all(self.sent_to(news, target) for target in self.targets)
+    
+    def delivery_keys(self, news, targets):
+        return [target.sent_key(news_hash) for target in targets for news_hash in news_hashes(news)]
     
     def get_news_hash(self, title, url):
         """Створюємо хеш для новини"""
         return hashlib.md5(f"{title}{url}".encode()).hexdigest()
     
+    def assign_canonical_url(self, news):
+        """Рахуємо хеш новини від канонічного URL
+
+        Канонічна форма - лише ключ (canonical_url): перевіряється і надсилається адреса
+        як зібрано або кінцева адреса відомого редиректу. Хеші попередніх форм URL
+        лишаються в hash_aliases, щоб історія, записана до канонізації, теж впізнавалась.
+        """
+        original_url = news.setdefault('original_url', news['url'])
+        canonical_url = self.url_canon.canonical(news['url'])
+        hashes = [self.get_news_hash(news['title'], url) for url in (canonical_url, news['url'], original_url)]
+        news['url'] = self.url_canon.resolve(news['url'])
+        news['canonical_url'] = canonical_url
+        news['hash'] = hashes[0]
+        aliases = set(news.get('hash_aliases', [])) | set(hashes[1:])
+        aliases.discard(news['hash'])
+        news['hash_aliases'] = sorted(aliases)
+    
     def check_url_validity(self, url, timeout=10):
         """Перевіряємо чи працює посилання"""
-        try:
-            response = requests.head(url, timeout=timeout, allow_redirects=True)
-            return response.status_code < 400
-        except:
-            try:
-                response = requests.get(url, timeout=timeout, allow_redirects=True)
-                return response.status_code < 400
-            except:
-                return False
+        return self.url_validator.check(self.url_canon.resolve(url), timeout=timeout)
     
     def scrape_blog_news(self, url):
         """Парсимо новини з блогів"""
+        started = time.perf_counter()
+        news_items = self.watermarks.new_items(url, self._scrape_blog_news(url))
+        seconds = time.perf_counter() - started
+        self.metrics.source(url, seconds=round(seconds, 4), items=len(news_items))
+        self.observe_source(url, news_items, seconds)
+        return news_items
+    
+    def _scrape_blog_news(self, url):
         news_items = []
+        timeout = self.source_health.timeout(url)
+        self.metrics.source(url, timeout=timeout)
+        # Необроблені записи минулого читання: на 304 розбираємо збережене тіло
+        replay = self.watermarks.has_pending(url)
         
         try:
-            # Спочатку пробуємо RSS
-            rss_urls = [
-                f"{url.rstrip('/')}/feed/",
-                f"{url.rstrip('/')}/rss/",
-                f"{url.rstrip('/')}/feed.xml",
-                f"{url.rstrip('/')}/rss.xml"
-            ]
+            # Стратегію (фід чи HTML) беремо з реєстру знайдених фідів
+            source = self.feed_registry.resolve(url, timeout)
+            max_bytes, entries = self.stream_settings(url)
             
-            for rss_url in rss_urls:
+            if source['strategy'] == 'feed':
+                rss_url = source['feed_url']
                 try:
-                    feed = feedparser.parse(rss_url)
-                    if feed.entries:
-                        for entry in feed.entries[:5]:  # Беремо останні 5
-                            # Перевіряємо чи новина свіжа (не старше 7 днів)
-                            if hasattr(entry, 'published_parsed'):
-                                pub_date = datetime(*entry.published_parsed[:6])
-                                if datetime.now() - pub_date > timedelta(days=7):
-                                    continue
-                            
-                            news_items.append({
-                                'title': entry.title,
-                                'content': BeautifulSoup(entry.summary, 'html.parser').get_text()[:500],
-                                'url': entry.link,
-                                'source': urlparse(url).netloc,
-                                'published': getattr(entry, 'published', 'Unknown')
-                            })
-                        break
-                except:
-                    continue
+                    feed_parser = self.feed_parser(url, entries)
+                    status, body, truncated = self.http_cache.stream(
+                        rss_url, self.metrics.timed('parse', feed_parser.feed), max_bytes, timeout=timeout,
+                        replay=replay)
+                    self.metrics.source(url, status=status, bytes=self.downloaded_bytes(status, body))
+                    if status == HttpCache.NOT_MODIFIED and body is None:
+                        # Фід не змінився з минулого запуску - нових новин немає
+                        logging.info(f"Not modified: {rss_url}")
+                        return news_items
+                    if status not in (200, HttpCache.NOT_MODIFIED):
+                        raise ValueError(f"feed status {status}")
+                    self.record_fetch(rss_url, truncated, feed_parser.done)
+                    news_items = feed_parser.close()
+                    if feed_parser.limit_reached:
+                        self.watermarks.mark_limited(url)
+                    if not feed_parser.is_feed:
+                        raise ValueError("response is not a feed")
+                    # Фід робочий: відсутність свіжих записів означає, що новин немає
+                    return news_items
+                except Exception as e:
+                    # Фід зламався - наступного разу шукаємо його заново
+                    logging.error(f"Feed error {rss_url}: {e}")
+                    self.feed_registry.invalidate(url)
             
-            # Якщо RSS не спрацював, пробуємо парсити HTML
+            # Джерело без фіду (або фід не спрацював) - парсимо HTML
             if not news_items:
-                response = requests.get(url, timeout=15)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Шукаємо статті за типовими селекторами
-                articles = soup.find_all(['article', 'div'], class_=re.compile(r'post|article|entry|blog'))
-                
-                for article in articles[:5]:
-                    title_elem = article.find(['h1', 'h2', 'h3'], class_=re.compile(r'title|heading'))
-                    link_elem = article.find('a', href=True)
-                    
-                    if title_elem and link_elem:
-                        title = title_elem.get_text().strip()
-                        link = urljoin(url, link_elem['href'])
-                        
-                        # Отримуємо короткий опис
-                        content_elem = article.find(['p', 'div'], class_=re.compile(r'excerpt|summary|content'))
-                        content = content_elem.get_text().strip()[:500] if content_elem else title
-                        
-                        news_items.append({
-                            'title': title,
-                            'content': content,
-                            'url': link,
-                            'source': urlparse(url).netloc,
-                            'published': 'Recent'
-                        })
+                status, body, truncated = self.http_cache.stream(url, None, max_bytes, timeout=timeout, replay=replay)
+                self.metrics.source(url, status=status, bytes=self.downloaded_bytes(status, body))
+                if status == HttpCache.NOT_MODIFIED and body is None:
+                    logging.info(f"Not modified: {url}")
+                    return news_items
+                self.record_fetch(url, truncated, False)
+                with self.metrics.stage('parse'):
+                    news_items = parsing.parse_html_articles(body, url, strict=True)
         
         except Exception as e:
             logging.error(f"Помилка парсингу {url}: {e}")
         
         return news_items
     
+    def observe_source(self, url, news_items, seconds):
+        """Передаємо результат опитування джерела розкладу та стану здоров'я (статус - з метрик запуску)"""
+        status = self.metrics.sources.get(url, {}).get('status')
+        self.source_schedule.observe(url, news_items, status)
+        self.source_health.observe(url, seconds, status, len(news_items))
+        self.metrics.source(url, error_streak=self.source_health.sources[url]['error_streak'])
+    
+    def due_sources(self):
+        """Блоги та лістинги Reddit, які час опитати в цьому запуску"""
+        blogs = [url for url in self.ai_config['sources']['blogs'] if self.shard.owns(url)]
+        listings = [(url, limit) for url, limit in self.reddit_listings() if self.shard.owns(url)]
+        if self.shard.enabled:
+            logging.info(f"Shard {self.shard.name} of {self.shard.count}: {len(blogs) + len(listings)} sources")
+        # Джерела з розімкнутим вимикачем не опитуємо до часу пробного запиту
+        available = set(self.source_health.available(blogs + [url for url, _ in listings]))
+        self.metrics.count('sources_circuit_open', len(blogs) + len(listings) - len(available))
+        blogs = [url for url in blogs if url in available]
+        listings = [(url, limit) for url, limit in listings if url in available]
+        due_blogs = self.source_schedule.due(blogs)
+        due_listings = [(url, limit) for url, limit in listings if self.source_schedule.is_due(url)]
+        self.source_schedule.log_plan(len(blogs) + len(listings), len(due_blogs) + len(due_listings))
+        return due_blogs, due_listings
+    
+    def source_priority(self, url):
+        """Цінність джерела: вага з relevance, за рівних - скільки записів воно зазвичай дає"""
+        weight = self.relevance.source_weight({'source_url': url, 'source': urlparse(url).netloc})
+        yields = self.source_health.sources.get(url, {}).get('yields') or [0]
+        return weight, sum(yields) / len(yields)
+    
+    def feed_parser(self, url, entries):
+        """Потоковий парсер фіду, що зупиняється на позначці джерела"""
+        return parsing.StreamingFeedParser(url, entries, since=self.watermarks.since(url),
+                                           known_ids=self.watermarks.known_ids(url))
+    
+    def stream_settings(self, url):
+        """Ліміт байтів та кількість свіжих записів для джерела"""
+        settings = self.ai_config.get('streaming', {})
+        max_kb = settings.get('per_source_max_kb', {}).get(url, settings.get('max_kb', 2048))
+        return max_kb * 1024, settings.get('entries', 5)
+    
+    def downloaded_bytes(self, status, body):
+        """Байти з мережі: тіло, повторно розібране з кешу на 304, не рахуємо"""
+        return len(body or b'') if status != HttpCache.NOT_MODIFIED else 0
+    
+    def record_fetch(self, url, truncated, stopped_early):
+        """Враховуємо обрізані завантаження та ранні зупинки у статистиці запуску"""
+        if truncated:
+            logging.warning(f"Truncated at byte cap: {url}")
+            self.run_stats['truncated'].append(url)
+        elif stopped_early:
+            self.run_stats['stopped_early'] += 1
+    
     async def scrape_blog_news_async(self, session, url):
         """Асинхронний парсинг блогу"""
+        started = time.perf_counter()
+        news_items = self.watermarks.new_items(url, await self._scrape_blog_news_async(session, url))
+        seconds = time.perf_counter() - started
+        self.metrics.source(url, seconds=round(seconds, 4), items=len(news_items))
+        self.observe_source(url, news_items, seconds)
+        return news_items
+    
+    async def _scrape_blog_news_async(self, session, url):
+        # Тайм-аут - за спостережуваною затримкою джерела, а не однаковий для всіх
+        timeout = self.source_health.timeout(url)
+        self.metrics.source(url, timeout=timeout)
+        replay = self.watermarks.has_pending(url)
         try:
-            async with session.get(url, timeout=15) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    # Використовуємо той же код парсингу
-                    return self.parse_blog_content(content, url)
+            source = await self.feed_registry.resolve_async(session, url, timeout)
+            max_bytes, entries = self.stream_settings(url)
+            if source['strategy'] == 'feed':
+                # Фід розбираємо по мірі надходження і зупиняємось, коли свіжих записів досить
+                fetch_url = source['feed_url']
+                feed_parser = self.feed_parser(url, entries)
+                status, content, truncated = await self.http_cache.stream_async(
+                    session, fetch_url, self.metrics.timed('parse', feed_parser.feed), max_bytes, timeout=timeout,
+                    replay=replay)
+            else:
+                fetch_url = url
+                feed_parser = None
+                status, content, truncated = await self.http_cache.stream_async(session, url, None, max_bytes,
+                                                                                timeout=timeout, replay=replay)
+            self.metrics.source(url, status=status, bytes=self.downloaded_bytes(status, content))
+            
+            if status == HttpCache.NOT_MODIFIED and content is None:
+                # Сторінка не змінилась і необроблених записів немає - парсинг не потрібен
+                logging.info(f"Not modified: {fetch_url}")
+            elif status in (200, HttpCache.NOT_MODIFIED):
+                self.record_fetch(fetch_url, truncated, feed_parser is not None and feed_parser.done)
+                if feed_parser is None:
+                    return await self.parse_blog_content_async(content, url)
+                news_items = feed_parser.close()
+                if feed_parser.limit_reached:
+                    self.watermarks.mark_limited(url)
+                if not feed_parser.is_feed:
+                    logging.error(f"Feed error {fetch_url}: response is not a feed")
+                    self.feed_registry.invalidate(url)
+                return news_items
+            elif feed_parser is not None:
+                logging.error(f"Feed error {fetch_url}: status {status}")
+                self.feed_registry.invalidate(url)
         except Exception as e:
             logging.error(f"Async error {url}: {e}")
         return []
 
     def parse_blog_content(self, content, url):
         """Виділений код парсингу контенту (з scrape_blog_news)"""
-        news_items = []
-        try:
-            # RSS спочатку
-            import feedparser
-            feed = feedparser.parse(content)
-            if feed.entries:
-                for entry in feed.entries[:5]:
-                    if hasattr(entry, 'published_parsed'):
-                        pub_date = datetime(*entry.published_parsed[:6])
-                        if datetime.now() - pub_date > timedelta(days=7):
-                            continue
-                    news_items.append({
-                        'title': entry.title,
-                        'content': BeautifulSoup(entry.summary, 'html.parser').get_text()[:500],
-                        'url': entry.link,
-                        'source': urlparse(url).netloc,
-                        'published': getattr(entry, 'published', 'Unknown')
-                    })
-            # Якщо RSS не працює, парсимо HTML
-            if not news_items:
-                soup = BeautifulSoup(content, 'html.parser')
-                articles = soup.find_all(['article', 'div'], class_=re.compile(r'post|article|entry|blog'))
-                for article in articles[:5]:
-                    title_elem = article.find(['h1', 'h2', 'h3'])
-                    link_elem = article.find('a', href=True)
-                    if title_elem and link_elem:
-                        title = title_elem.get_text().strip()
-                        link = urljoin(url, link_elem['href'])
-                        content_elem = article.find(['p', 'div'])
-                        content = content_elem.get_text().strip()[:500] if content_elem else title
-                        news_items.append({
-                            'title': title,
-                            'content': content,
-                            'url': link,
-                            'source': urlparse(url).netloc,
-                            'published': 'Recent'
-                        })
-        except Exception as e:
-            logging.error(f"Parse error {url}: {e}")
-        return news_items
+        return parsing.parse_blog_content(content, url)
+    
+    async def parse_blog_content_async(self, content, url):
+        """Парсинг у пулі процесів, щоб не блокувати цикл подій"""
+        with self.metrics.stage('parse'):
+            if self.parse_pool is None:
+                return self.parse_blog_content(content, url)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.parse_pool, parsing.parse_blog_content, content, url)
 
-    def fetch_reddit_posts(self):
-        """Парсинг топових постів з AI subreddit'ів"""
+    def reddit_listings(self):
+        """Лістинги Reddit: один multireddit-запит (r/a+b+c) або окремий запит на кожен subreddit"""
         subreddits = self.ai_config['sources']['reddit']
+        settings = self.ai_config.get('reddit', {})
+        limit = settings.get('limit_per_subreddit', 5)
+        base_url = settings.get('base_url', 'https://www.reddit.com').rstrip('/')
+        if settings.get('multireddit', True):
+            names = '+'.join(subreddit.replace('r/', '') for subreddit in subreddits)
+            return [(f"{base_url}/r/{names}/hot.json", limit * len(subreddits))]
+        return [(f"{base_url}/{subreddit}/hot.json", limit) for subreddit in subreddits]
+    
+    def reddit_quota_filled(self, listing_url, per_subreddit):
+        """Чи набрано limit_per_subreddit постів з кожного subreddit'у лістингу
+        (у multireddit великі subreddit'и можуть витіснити малі з першої сторінки)"""
+        limit = self.ai_config.get('reddit', {}).get('limit_per_subreddit', 5)
+        names = urlparse(listing_url).path.split('/r/', 1)[1].split('/')[0].split('+')
+        counts = {subreddit.lower(): count for subreddit, count in per_subreddit.items()}
+        return all(counts.get(name.lower(), 0) >= limit for name in names)
+    
+    def reddit_page_url(self, listing_url, limit, after=None):
+        # Reddit віддає не більше 100 постів за запит
+        url = f"{listing_url}?limit={min(limit, 100)}"
+        return f"{url}&after={after}" if after else url
+    
+    def parse_reddit_listing(self, data, posts, per_subreddit, known_ids=frozenset()):
+        """Додаємо пости з лістингу, не більше limit_per_subreddit з кожного subreddit'у;
+        вже оброблені (known_ids) пропускаємо, не рахуючи в ліміт"""
+        limit = self.ai_config.get('reddit', {}).get('limit_per_subreddit', 5)
+        for post in data['data']['children']:
+            post_data = post['data']
+            subreddit = post_data['subreddit']
+            if per_subreddit.get(subreddit, 0) >= limit:
+                continue
+            post_id = post_data.get('name') or post_data['permalink']
+            if post_id in known_ids:
+                continue
+            # Фільтруємо тільки пости з текстом/посиланнями
+            if post_data.get('selftext') or post_data.get('url'):
+                per_subreddit[subreddit] = per_subreddit.get(subreddit, 0) + 1
+                posts.append({
+                    'title': post_data['title'],
+                    'content': post_data.get('selftext', '')[:500],
+                    'url': post_data.get('url', f"https://reddit.com{post_data['permalink']}"),
+                    'source': f"reddit-{subreddit}",
+                    'entry_id': post_id
+                })
+        return data['data'].get('after')
+    
+    def fetch_reddit_posts(self, listings=None):
+        """Парсинг топових постів з AI subreddit'ів"""
+        pages = self.ai_config.get('reddit', {}).get('pages', 4)
         posts = []
+        per_subreddit = {}
+        
+        for listing_url, limit in (self.reddit_listings() if listings is None else listings):
+            found = len(posts)
+            after = None
+            started = time.perf_counter()
+            timeout = self.source_health.timeout(listing_url, default=10)
+            replay = self.watermarks.has_pending(listing_url)
+            for page in range(pages):
+                url = self.reddit_page_url(listing_url, limit, after)
+                try:
+                    status, body = self.http_cache.get(url, headers=REDDIT_HEADERS, timeout=timeout, replay=replay)
+                    self.metrics.source(listing_url, status=status)
+                    time.sleep(1)  # Пауза між запитами
+                    if status == HttpCache.NOT_MODIFIED and body is None:
+                        logging.info(f"Not modified: {url}")
+                        break
+                    if status not in (200, HttpCache.NOT_MODIFIED):
+                        logging.error(f"Помилка Reddit {url}: status {status}")
+                        break
+                    after = self.parse_reddit_listing(json.loads(body), posts, per_subreddit,
+                                                      self.watermarks.known_ids(listing_url))
+                except Exception as e:
+                    logging.error(f"Помилка Reddit {url}: {e}")
+                    break
+                if not after or self.reddit_quota_filled(listing_url, per_subreddit):
+                    break
+            posts[found:] = self.watermarks.new_items(listing_url, posts[found:])
+            self.observe_source(listing_url, posts[found:], time.perf_counter() - started)
         
-        for subreddit in subreddits:
+        return posts
+    
+    async def fetch_reddit_listing_async(self, session, listing_url, limit, posts, per_subreddit):
+        started = time.perf_counter()
+        # Свій список для лістингу: інші лістинги дописують у posts паралельно
+        listing_posts = []
+        try:
+            await self._fetch_reddit_listing_async(session, listing_url, limit, listing_posts, per_subreddit)
+        finally:
+            listing_posts = self.watermarks.new_items(listing_url, listing_posts)
+            posts.extend(listing_posts)
+            self.metrics.source(listing_url, seconds=round(time.perf_counter() - started, 4),
+                                items=len(listing_posts))
+        self.observe_source(listing_url, listing_posts, time.perf_counter() - started)
+    
+    async def _fetch_reddit_listing_async(self, session, listing_url, limit, posts, per_subreddit):
+        pages = self.ai_config.get('reddit', {}).get('pages', 4)
+        timeout = self.source_health.timeout(listing_url, default=10)
+        self.metrics.source(listing_url, timeout=timeout)
+        replay = self.watermarks.has_pending(listing_url)
+        after = None
+        for page in range(pages):
+            url = self.reddit_page_url(listing_url, limit, after)
             try:
-                url = f"https://www.reddit.com/{subreddit}/hot.json?limit=5"
-                headers = {'User-Agent': 'AI News Monitor 1.0'}
-                response = requests.get(url, headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    for post in data['data']['children']:
-                        post_data = post['data']
-                        # Фільтруємо тільки пости з текстом/посиланнями
-                        if post_data.get('selftext') or post_data.get('url'):
-                            posts.append({
-                                'title': post_data['title'],
-                                'content': post_data.get('selftext', '')[:500],
-                                'url': post_data.get('url', f"https://reddit.com{post_data['permalink']}"),
-                                'source': f"reddit-{subreddit.replace('r/', '')}"
-                            })
-                time.sleep(1)  # Пауза між запитами
+                # Темп запитів до Reddit тримає лімітер хоста, а не sleep
+                await self.host_limiter.acquire(url)
+                status, body = await self.http_cache.get_async(session, url, headers=REDDIT_HEADERS, timeout=timeout,
+                                                               replay=replay)
+                source = self.metrics.sources.get(listing_url, {})
+                self.metrics.source(listing_url, status=status,
+                                    bytes=source.get('bytes', 0) + self.downloaded_bytes(status, body))
+                if status == HttpCache.NOT_MODIFIED and body is None:
+                    logging.info(f"Not modified: {url}")
+                    return
+                if status not in (200, HttpCache.NOT_MODIFIED):
+                    logging.error(f"Помилка Reddit {url}: status {status}")
+                    return
+                after = self.parse_reddit_listing(json.loads(body), posts, per_subreddit,
+                                                  self.watermarks.known_ids(listing_url))
             except Exception as e:
-                logging.error(f"Помилка Reddit {subreddit}: {e}")
-                continue
-        
+                logging.error(f"Async Reddit error {url}: {e}")
+                return
+            if not after or self.reddit_quota_filled(listing_url, per_subreddit):
+                return
+    
+    async def fetch_reddit_posts_async(self, session, listings=None):
+        """Асинхронний парсинг Reddit (паралельно з блогами)"""
+        posts = []
+        per_subreddit = {}
+        listings = self.reddit_listings() if listings is None else listings
+        await asyncio.gather(*[self.fetch_reddit_listing_async(session, listing_url, limit, posts, per_subreddit)
+                               for listing_url, limit in listings])
         return posts
     
+    def log_run_stats(self):
+        logging.info(f"Streaming: {self.run_stats['stopped_early']} feeds stopped early, "
+                     f"{len(self.run_stats['truncated'])} truncated at byte cap")
+        for url in self.run_stats['truncated']:
+            logging.info(f"Truncated: {url}")
+    
     def search_ai_news(self):
         """Пошук AI новин з різних джерел"""
         logging.info("Searching for latest AI news...")
+        self.run_stats = {'truncated': [], 'stopped_early': 0}
         all_news = []
+        blogs, listings = self.due_sources()
         # Парсимо блоги
-        for blog_url in self.ai_config['sources']['blogs']:
+        for blog_url in blogs:
             logging.info(f"Парсю {blog_url}")
             news_items = self.scrape_blog_news(blog_url)
             all_news.extend(news_items)
             time.sleep(2)  # Пауза між запитами
         # Додаємо Reddit
-        reddit_posts = self.fetch_reddit_posts()
+        reddit_posts = self.fetch_reddit_posts(listings)
         all_news.extend(reddit_posts)
         # Додаємо пошук через веб-пошук для додаткових новин
         try:
@@ -310,80 +605,84 @@ class AINewsMonitor:
             # Тут можна додати додаткові джерела новин
         except Exception as e:
             logging.error(f"Помилка веб-пошуку: {e}")
+        self.http_cache.save()
+        self.feed_registry.save()
+        self.source_schedule.save()
+        self.source_health.save()
+        # Позначки "є необроблені записи" мають пережити збій до commit_watermarks
+        self.watermarks.save()
+        self.log_run_stats()
         logging.info(f"Found {len(all_news)} news items")
         return all_news
     
-    async def search_ai_news_async(self):
+    def create_parse_pool(self):
+        workers = self.ai_config.get('parsing', {}).get('workers') or os.cpu_count()
+        return ProcessPoolExecutor(max_workers=workers)
+    
+    async def search_ai_news_async(self, session=None):
         """Асинхронний пошук всіх новин"""
         logging.info("Starting async news search...")
-        async with aiohttp.ClientSession() as session:
-            # Асинхронно парсимо всі блоги
-            blog_tasks = [self.scrape_blog_news_async(session, url)
-                          for url in self.ai_config['sources']['blogs']]
-            blog_results = await asyncio.gather(*blog_tasks, return_exceptions=True)
-            all_news = []
-            for result in blog_results:
-                if isinstance(result, list):
-                    all_news.extend(result)
-        # Reddit все ще синхронно (їх API не любить багато паралельних запитів)
-        reddit_posts = self.fetch_reddit_posts()
-        all_news.extend(reddit_posts)
+        self.run_stats = {'truncated': [], 'stopped_early': 0}
+        # У демоні пул процесів живе між циклами, у разовому запуску - лише на час пошуку
+        own_pool = self.parse_pool is None
+        if own_pool:
+            self.parse_pool = self.create_parse_pool()
+        try:
+            all_news = await self._search_sources_async(session)
+        finally:
+            if own_pool:
+                self.parse_pool.shutdown()
+                self.parse_pool = None
+        self.http_cache.save()
+        self.feed_registry.save()
+        self.source_schedule.save()
+        self.source_health.save()
+        # Позначки "є необроблені записи" мають пережити збій до commit_watermarks
+        self.watermarks.save()
+        self.log_run_stats()
         logging.info(f"Found {len(all_news)} total news items (async)")
         return all_news
     
+    async def _search_sources_async(self, session=None):
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self._search_sources_async(session)
+        # Асинхронно парсимо всі блоги та Reddit одночасно - лише ті, час яких настав.
+        # Цінніші джерела стартують першими, а під дедлайн скасовуються останніми
+        blogs, listings = self.due_sources()
+        posts = []
+        per_subreddit = {}
+        jobs = [(self.source_priority(url), self.scrape_blog_news_async(session, url)) for url in blogs]
+        jobs += [(self.source_priority(url), self.fetch_reddit_listing_async(session, url, limit, posts, per_subreddit))
+                 for url, limit in listings]
+        results = await self.budget.gather_prioritized('fetch', jobs)
+        self.metrics.count('sources_cancelled', sum(isinstance(result, asyncio.CancelledError) for result in results))
+        # Скасований лістинг Reddit встигає дописати в posts уже розібрані сторінки
+        all_news = list(posts)
+        for result in results:
+            if isinstance(result, list):
+                all_news.extend(result)
+        return all_news
+    
     def filter_news(self, news_list):
-        # Жорстко заблокувати проблемну новину
-        BLOCKED_HASHES = [
-            "d111de5e8f40ffc15ad19821fc73c27d"  # What is LLMOps
-        ]
+        """Пропускаємо новини через конвеєр фільтрів"""
+        return asyncio.run(self.filter_news_async(news_list))
+    
+    async def filter_news_async(self, news_list, session=None):
+        """Конвеєр фільтрів у циклі подій; мережеві етапи використовують session"""
+        # Скорочені посилання розкриваємо до хешування, решту лише нормалізуємо
+        await self.url_canon.resolve_many([news['url'] for news in news_list], session)
+        for news in news_list:
+            self.assign_canonical_url(news)
         
-        filtered = []
-        keywords = self.ai_config['filter_criteria']['keywords']
-        exclude_keywords = self.ai_config['filter_criteria'].get('exclude_keywords', [])
-        
-        for i, news in enumerate(news_list):
-            logging.info(f"\n--- Processing news {i+1}/{len(news_list)} ---")
-            logging.info(f"Title: {news['title'][:50]}...")
-            
-            # Генеруємо хеш
-            news_hash = self.get_news_hash(news['title'], news['url'])
-            logging.info(f"Hash: {news_hash}")
-            
-            # Перевірка дублікатів
-            if news_hash in self.sent_news:
-                logging.info("❌ DUPLICATE - already sent, skipping")
-                continue
-            else:
-                logging.info("✅ NEW - not in sent list")
-            
-            # Перевірка на блокування
-            if news_hash in BLOCKED_HASHES:
-                logging.info(f"PERMANENTLY BLOCKED: {news['title'][:50]}")
-                continue
-            else:
-                logging.info("✅ NOT BLOCKED")
-            
-            # Решта фільтрів
-            text_to_check = f"{news['title']} {news['content']}".lower()
-            
-            if any(exclude_word.lower() in text_to_check for exclude_word in exclude_keywords):
-                logging.info("❌ EXCLUDED by keywords")
-                continue
-                
-            if len(news['content']) < 100:
-                logging.info("❌ TOO SHORT")
-                continue
-                
-            if not self.check_url_validity(news['url']):
-                logging.info("❌ URL NOT WORKING")
-                continue
-                
-            if any(keyword.lower() in text_to_check for keyword in keywords):
-                logging.info("✅ PASSED all filters - will send")
-                news['hash'] = news_hash
-                filtered.append(news)
-            else:
-                logging.info("❌ NO MATCHING keywords")
+        pipeline = FilterPipeline(self, self.ai_config['filter_criteria'])
+        filtered = await pipeline.run_async(news_list, session)
+        self.deferred_news = pipeline.deferred
+        pipeline.log_stats()
+        for name, stats in pipeline.stats.items():
+            # Мережева перевірка посилань - окремий етап запуску
+            stage = 'validate' if name == 'url_validity' else f"filter.{name}"
+            self.metrics.add_time(stage, stats['seconds'], stats['passed'] + stats['dropped'])
         
         logging.info(f"=== FILTERING COMPLETE ===")
         logging.info(f"Will send {len(filtered)} news items")
@@ -391,126 +690,224 @@ class AINewsMonitor:
     
     def translate_to_ukrainian(self, text):
         """Переклад тексту на українську"""
+        cache_key = self.translation_cache.make_key(
+            text, TRANSLATION_MODEL, [TRANSLATION_SYSTEM_PROMPT, TRANSLATION_USER_PROMPT], TRANSLATION_TEMPERATURE
+        )
+        cached = self.translation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
+                model=TRANSLATION_MODEL,
                 messages=[
-                    {"role": "system", "content": "Ти професійний перекладач технічних текстів. Переклади текст на українську мову, зберігаючи технічні терміни та назви продуктів. Переклад має бути природним та зрозумілим."},
-                    {"role": "user", "content": f"Переклади цей текст на українську: {text}"}
+                    {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
+                    {"role": "user", "content": TRANSLATION_USER_PROMPT.format(text=text)}
                 ],
                 max_tokens=800,
-                temperature=0.3
+                temperature=TRANSLATION_TEMPERATURE
             )
             
-            return response.choices[0].message.content.strip()
+            translation = response.choices[0].message.content.strip()
+            # Кешуємо лише успішні переклади - помилку повторимо наступного разу
+            self.translation_cache.put(cache_key, translation)
+            return translation
             
         except Exception as e:
             logging.error(f"Помилка перекладу: {e}")
             return text
     
-    def format_news_message(self, news):
-        """Форматуємо новину для Telegram"""
-        
-        # Перекладаємо заголовок та контент
-        title_ua = self.translate_to_ukrainian(news['title'])
-        content_ua = self.translate_to_ukrainian(news['content'])
-        
-        # Форматуємо повідомлення
-        message = f"🚀 {title_ua}\n\n"
-        
-        # Додаємо основний контент
-        sentences = content_ua.split('. ')
-        for sentence in sentences[:5]:  # Беремо перші 5 речення
-            if sentence.strip():
-                message += f"• {sentence.strip()}.\n"
-        
-        message += "\n😶😶😶\n\n"
-        message += f"🔗 Детальніше: {news['url']}\n"
-        message += f"📰 Джерело: {news['source']}\n\n"
-        message += "👍 [Група](https://t.me/novyni_hi)"
-        
-        return message
+    def translate_news(self, news_list):
+        """Перекладаємо заголовки та контент усіх новин одним пакетом"""
+        asyncio.run(self.translate_news_async(news_list))
     
-    def send_to_telegram(self, message):
-        """Надсилаємо повідомлення у Telegram"""
-        bot_token = self.secrets['TELEGRAM']['secrets']['BOT_TOKEN']
-        chat_id = self.telegram_config['target_group']['chat_id']
-        
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        
-        data = {
-            'chat_id': chat_id,
-            'text': message,
-            'parse_mode': 'Markdown',
-            'disable_web_page_preview': False
-        }
-        
-        try:
-            response = requests.post(url, data=data, timeout=10)
-            if response.status_code == 200:
-                logging.info("Message sent successfully!")
-                return True
-            else:
-                logging.error(f"❌ Помилка надсилання: {response.status_code} - {response.text}")
+    async def translate_news_async(self, news_list, languages=('uk',), cached_only=False):
+        """Пакетний переклад - один на кожну мову цілей, мови паралельно
+        (cached_only - лише з кешу перекладів, без запитів до API)"""
+        languages = [language for language in dict.fromkeys(languages) if language != ORIGINAL_LANGUAGE]
+        if not languages:
+            return
+        texts = [text for news in news_list for text in (news['title'], news['content'])]
+        if self.session is not None and self.openai_async is None:
+            # Демон: клієнт OpenAI створюємо з першим перекладом і тримаємо між циклами
+            self.openai_async = self.batch_translator.create_client()
+        results = await asyncio.gather(*[self.batch_translator.translate_all(texts, self.openai_async, language,
+                                                                             cached_only)
+                                         for language in languages])
+        # Що не переклалося пакетом, лишається None - таку новину цикл відкладе до наступного запуску
+        for language, translations in zip(languages, results):
+            for news in news_list:
+                news.setdefault('translations', {})[language] = {
+                    'title': translations.get(news['title']),
+                    'content': translations.get(news['content'])
+                }
+                if language == 'uk':
+                    news['title_ua'] = translations.get(news['title'])
+                    news['content_ua'] = translations.get(news['content'])
+    
+    def is_translated(self, news, targets):
+        """Чи є готовий переклад новини для всіх мов цілей"""
+        for target in targets:
+            if target.language == ORIGINAL_LANGUAGE:
+                continue
+            translated = news.get('translations', {}).get(target.language, {})
+            if not translated.get('title') or not translated.get('content'):
                 return False
-        except Exception as e:
-            logging.error(f"❌ Помилка підключення до Telegram: {e}")
-            return False
+        return True
     
-    def save_news_to_file(self, message, news):
-        """Зберігаємо новину у файл"""
-        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
-        filename = f"./data/news_{timestamp}.md"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# AI News - {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
-            f.write(message)
-            f.write(f"\n\n---\n")
-            f.write(f"Original Title: {news['title']}\n")
-            f.write(f"Source: {news['source']}\n")
-            f.write(f"URL: {news['url']}\n")
-        
-        return filename
+    def localized(self, news, language):
+        """Заголовок і текст новини мовою цілі"""
+        if language == ORIGINAL_LANGUAGE:
+            return news['title'], news['content']
+        # Лише пакетний переклад або кеш: поштучний синхронний запит до OpenAI блокував би
+        # цикл подій поза бюджетом часу. Цикл неперекладене не форматує (див. is_translated)
+        translated = news.get('translations', {}).get(language, {})
+        if not translated.get('title') or not translated.get('content'):
+            logging.warning(f"No {language} translation for {news['hash']} - sending the original text")
+        return translated.get('title') or news['title'], translated.get('content') or news['content']
+    
+    def format_news_message(self, news, target=None):
+        """Форматуємо новину для цілі розсилки (за замовчуванням - основної)"""
+        target = target or self.targets[0]
+        title, content = self.localized(news, target.language)
+        return target.render(news, title, content)
+    
+    def send_to_telegram(self, message):
+        """Надсилаємо повідомлення в основну ціль"""
+        target = self.targets[0]
+        result = asyncio.run(self.telegram.deliver([(target.chat_id, message, target.message_settings)]))[0]
+        return result['ok']
+    
+    @property
+    def archive(self):
+        if self._archive is None:
+            from news_archive import NewsArchive
+            settings = self.ai_config.get('archive') or {}
+            if self.shard.enabled:
+                settings = dict(settings, dir=self.state_path('archive'))
+            self._archive = NewsArchive(settings)
+        return self._archive
+    
+    def save_news_to_file(self, message, news, status='saved'):
+        """Зберігаємо новину в архів; повертаємо шлях сегмента
+        (markdown - на вимогу: python news_archive.py export)"""
+        from news_archive import make_record
+        return self.archive.append(make_record(news, message, status))
     
     def run_once(self):
+        """Разовий запуск: один цикл подій і одна сесія на весь запуск"""
+        asyncio.run(self.run_once_async())
+    
+    async def run_once_async(self):
+        """Повний цикл моніторингу; у демоні використовує довгоживучі сесію, пул і клієнт OpenAI"""
+        if self.session is None:
+            async with self.create_session() as session:
+                return await self._run_cycle(session)
+        return await self._run_cycle(self.session)
+    
+    async def _run_cycle(self, session):
         logging.info("=== AI NEWS MONITOR STARTED ===")
         logging.info(f"Loaded {len(self.sent_news)} previously sent news hashes")
+        self.metrics = RunMetrics(self.metrics_settings())
+        self.budget = RunBudget(self.ai_config.get('run_budget'))
+        self.reset_counters()
+        # Надіслане має потрапити на диск навіть тоді, коли цикл не дійшов до persist
+        persisted = False
         
         try:
-            news_list = asyncio.run(self.search_ai_news_async())
+            with self.metrics.stage('fetch') as stage:
+                news_list = await self.search_ai_news_async(session)
+                stage['items'] = len(news_list)
             if not news_list:
                 logging.info("No news found")
                 return
                 
-            filtered_news = self.filter_news(news_list)
+            with self.metrics.stage('filter') as stage:
+                filtered_news = await self.filter_news_async(news_list, session)
+                stage['items'] = len(news_list)
             
             if not filtered_news:
                 logging.info("No new relevant news found")
+                # Усе прочитане оброблено фільтрами (крім відкладених) - позначки можна зсунути
+                self.commit_watermarks(news_list, self.deferred_news)
                 return
             
-            sent_count = 0
-            for i, news in enumerate(filtered_news[:3]):
-                logging.info(f"\n=== SENDING NEWS {i+1} ===")
-                logging.info(f"Hash: {news['hash']}")
-                
+            # Після етапу relevance новини впорядковані за оцінкою
+            claimed = self.claim_news(filtered_news[:self.relevance.select])
+            if not claimed:
+                logging.info("All selected news are claimed by other workers")
+                self.commit_watermarks(news_list, filtered_news + self.deferred_news)
+                return
+            selected_news = [news for news, _ in claimed]
+            languages = [target.language for _, targets in claimed for target in targets]
+            with self.metrics.stage('translate') as stage:
                 try:
-                    message = self.format_news_message(news)
-                    filename = self.save_news_to_file(message, news)
-                    
-                    if self.send_to_telegram(message):
-                        logging.info(f"✅ Successfully sent news with hash {news['hash']}")
-                        self.sent_news.append(news['hash'])
-                        sent_count += 1
-                        time.sleep(self.telegram_config['rate_limits']['delay_between_messages'])
-                    else:
-                        logging.error(f"❌ Failed to send news with hash {news['hash']}")
-                        
-                except Exception as e:
-                    logging.error(f"Error processing news: {e}")
+                    await self.budget.wait_for('translate', self.translate_news_async(selected_news, languages))
+                except asyncio.TimeoutError:
+                    # Завершені до дедлайну пакети вже в кеші
+                    await self.translate_news_async(selected_news, languages, cached_only=True)
+                # Неперекладене (збій пакета чи дедлайн) не надсилаємо: резерв знімається,
+                # новина лишається в pending і повернеться наступного запуску
+                ready = [(news, targets) for news, targets in claimed if self.is_translated(news, targets)]
+                if len(ready) < len(claimed):
+                    logging.warning(f"Postponing {len(claimed) - len(ready)} untranslated news to the next run")
+                self.metrics.count('news_untranslated', len(claimed) - len(ready))
+                stage['items'] = len(selected_news)
+            
+            # Розгалуження: повідомлення для кожної цілі, якій новину ще не надіслано
+            outgoing = []
+            with self.metrics.stage('format') as stage:
+                for news, targets in ready:
+                    for target in targets:
+                        try:
+                            outgoing.append((news, target, self.format_news_message(news, target)))
+                        except Exception as e:
+                            logging.error(f"Error processing news for {target.name}: {e}")
+                stage['items'] = len(outgoing)
+            
+            # Черга доставки сама витримує ліміти Telegram - без фіксованих пауз; різні чати - паралельно
+            with self.metrics.stage('send') as stage:
+                results = await self.telegram.deliver(
+                    [(target.chat_id, message, target.message_settings) for _, target, message in outgoing], session,
+                    self.budget.time_left('send')
+                )
+                stage['items'] = len(outgoing)
+            
+            sent_count = 0
+            delivered = {}
+            for (news, target, _), result in zip(outgoing, results):
+                if result['ok']:
+                    logging.info(f"✅ Successfully sent news with hash {news['hash']} to {target.name} "
+                                 f"(latency {result['latency']:.2f}s)")
+                    for key in self.delivery_keys(news, [target]):
+                        self.sent_news.add(key)
+                    delivered[id(news)] = delivered.get(id(news), 0) + 1
+                    sent_count += 1
+                else:
+                    logging.error(f"❌ Failed to send news with hash {news['hash']} to {target.name}")
+            # Новина оброблена, коли її отримали всі цілі; інакше решта цілей отримає її наступного запуску
+            sent_ids = set()
+            for news, targets in claimed:
+                if delivered.get(id(news), 0) == len(targets):
+                    sent_ids.add(id(news))
+                    self.near_duplicates.add(news)
+            # Резерв невідправлених знімаємо одразу - їх зможе взяти наступний запуск
+            self.sent_news.release([key for news, targets in claimed for key in self.delivery_keys(news, targets)],
+                                   self.claim_owner)
+            self.metrics.count('news_sent', sent_count)
+            self.metrics.count('news_failed', len(outgoing) - sent_count)
+            self.archive_outgoing(outgoing, results)
             
             # Зберігаємо оновлений список
-            logging.info(f"Saving {len(self.sent_news)} total sent news hashes")
-            self.save_sent_news()
+            with self.metrics.stage('persist'):
+                logging.info(f"Saving {len(self.sent_news)} total sent news hashes")
+                self.save_sent_news()
+                self.translation_cache.evict()
+                # Не надіслані новини (за межами вибірки чи з помилкою) повернуться наступного разу
+                pending = [news for news in filtered_news if id(news) not in sent_ids] + self.deferred_news
+                self.commit_watermarks(news_list, pending)
+                persisted = True
+            self.translation_cache.log_stats()
             
             logging.info(f"=== MONITOR COMPLETE: sent {sent_count} news ===")
             
@@ -518,10 +915,152 @@ class AINewsMonitor:
             logging.error(f"Critical error: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            if not persisted:
+                self.persist_sent_news()
+            self.budget.log_summary()
+            self.metrics.count('budget_seconds_left', round(self.budget.remaining(), 1))
+            self.write_metrics()
+    
+    def persist_sent_news(self):
+        """Записуємо історію надісланого поза етапом persist (збій чи скасування циклу)"""
+        try:
+            self.save_sent_news()
+        except Exception as e:
+            logging.error(f"Error saving sent news: {e}")
+    
+    def claim_news(self, news_list):
+        """Атомарно резервуємо новини (для цілей, яким їх ще не надіслано) перед перекладом;
+        зайняті іншим процесом пропускаємо - не надіслані, вони лишаються в pending і
+        позначки через них не перейдуть. Повертаємо [(news, targets), ...]"""
+        claimed = []
+        for news in news_list:
+            targets = self.pending_targets(news)
+            if self.sent_news.claim(self.delivery_keys(news, targets), self.claim_owner):
+                claimed.append((news, targets))
+            else:
+                logging.info(f"Skipping news claimed elsewhere: {news['title'][:50]}")
+        self.metrics.count('news_claimed_elsewhere', len(news_list) - len(claimed))
+        return claimed
+    
+    def archive_outgoing(self, outgoing, results):
+        """Одним дозаписом архівуємо всі повідомлення циклу разом зі статусом доставки"""
+        from news_archive import make_record
+        records = [make_record(news, message, 'sent' if result['ok'] else 'failed', dict(result, target=target.name))
+                   for (news, target, message), result in zip(outgoing, results)]
+        try:
+            self.archive.append_many(records)
+        except Exception as e:
+            logging.error(f"Error archiving news: {e}")
+    
+    def commit_watermarks(self, news_list, pending):
+        """Зсуваємо позначки джерел після обробки і записуємо їх"""
+        self.watermarks.advance(news_list, pending)
+        self.watermarks.save()
+    
+    def reset_counters(self):
+        """Лічильники кешів рахуємо за цикл, а не за весь час роботи демона"""
+        self.http_cache.not_modified = self.http_cache.downloaded = self.http_cache.bytes_downloaded = 0
+        self.url_validator.cache_hits = self.url_validator.checked = 0
+        if self._translation_cache is not None:
+            self._translation_cache.hits = self._translation_cache.misses = 0
+    
+    def seconds_until_next_poll(self):
+        """Час до найближчого джерела за розкладом; джерело з розімкнутим вимикачем чекає пробного запиту"""
+        urls = self.ai_config['sources']['blogs'] + [url for url, _ in self.reddit_listings()]
+        urls = [url for url in urls if self.shard.owns(url)]
+        return self.source_schedule.seconds_until_due(urls, blocked_until={
+            url: self.source_health.blocked_until(url) for url in urls})
+    
+    def create_session(self):
+        """Спільна сесія: keep-alive з'єднання та кеш DNS для всіх запитів циклу"""
+        settings = self.ai_config.get('daemon', {})
+        connector = aiohttp.TCPConnector(
+            limit=settings.get('max_connections', 100),
+            limit_per_host=settings.get('per_host', 8),
+            ttl_dns_cache=settings.get('dns_cache_seconds', 600),
+            keepalive_timeout=settings.get('keepalive_seconds', 120)
+        )
+        return aiohttp.ClientSession(connector=connector)
+    
+    async def open_daemon_resources(self):
+        """Ресурси, що живуть між циклами демона"""
+        self.session = self.create_session()
+        self.parse_pool = self.create_parse_pool()
+    
+    async def close_daemon_resources(self):
+        """Зберігаємо стан і закриваємо довгоживучі ресурси"""
+        self.flush_state()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown()
+            self.parse_pool = None
+        if self.openai_async is not None:
+            await self.openai_async.close()
+            self.openai_async = None
+    
+    def flush_state(self):
+        """Записуємо на диск усі кеші та історію (при зупинці демона)"""
+        logging.info("Flushing state")
+        flushes = [self.save_sent_news, self.http_cache.save, self.feed_registry.save, self.source_schedule.save,
+                   self.source_health.save, self.watermarks.save, self.url_validator.save_cache, self.url_canon.save]
+        if self._translation_cache is not None:
+            flushes.append(self._translation_cache.evict)
+        for flush in flushes:
+            try:
+                flush()
+            except Exception as e:
+                logging.error(f"Error flushing state ({flush.__qualname__}): {e}")
+    
+    def write_metrics(self):
+        """Доповнюємо метрики запуску лічильниками кешів та записуємо їх у ./logs"""
+        try:
+            self.metrics.cache('http', self.http_cache.not_modified, self.http_cache.downloaded)
+            self.metrics.cache('url_validation', self.url_validator.cache_hits, self.url_validator.checked)
+            if self._translation_cache is not None:
+                self.metrics.cache('translation', self._translation_cache.hits, self._translation_cache.misses)
+            self.metrics.count('bytes_fetched', self.http_cache.bytes_downloaded)
+            self.metrics.count('feeds_stopped_early', self.run_stats['stopped_early'])
+            self.metrics.count('sources_truncated', len(self.run_stats['truncated']))
+            self.metrics.write()
+        except Exception as e:
+            logging.error(f"Error writing run metrics: {e}")
+
+def worker_log_file(worker, workers):
+    return f'./logs/ai_news_{worker_name(worker)}.log' if workers and workers > 1 else './logs/ai_news.log'
+
+def run_worker(worker, workers):
+    """Один воркер шардованого запуску (окремий процес)"""
+    setup_logging(worker_log_file(worker, workers))
+    AINewsMonitor(worker, workers).run_once()
+
+def run_sharded(workers):
+    """Усі воркери на цьому вузлі паралельно, кожен - у своєму процесі"""
+    import multiprocessing
+    processes = [multiprocessing.Process(target=run_worker, args=(worker, workers), name=worker_name(worker))
+                 for worker in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    failed = [process.name for process in processes if process.exitcode]
+    if failed:
+        raise SystemExit(f"Workers failed: {', '.join(failed)}")
 
 def main():
     """Основна функція"""
-    monitor = AINewsMonitor()
+    parser = argparse.ArgumentParser(description='AI News monitor')
+    parser.add_argument('--workers', type=int, help='split sources across N workers by consistent hashing')
+    parser.add_argument('--worker', type=int,
+                        help='run only this worker index (one worker per node); without it all workers start here')
+    args = parser.parse_args()
+    if args.workers and args.workers > 1 and args.worker is None:
+        run_sharded(args.workers)
+        return
+    setup_logging(worker_log_file(args.worker or 0, args.workers))
+    monitor = AINewsMonitor(args.worker, args.workers)
     monitor.run_once()
 
 if __name__ == "__main__":
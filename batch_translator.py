@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import random
+import asyncio
+import logging
+
+import openai
+
+BATCH_SYSTEM_PROMPT = (
+    "Ти професійний перекладач технічних текстів. Переклади кожен текст на українську мову, "
+    "зберігаючи технічні терміни та назви продуктів. Переклад має бути природним та зрозумілим. "
+    "Отримаєш JSON {\"items\": [{\"id\": ..., \"text\": ...}]}. "
+    "Відповідай лише JSON {\"translations\": [{\"id\": ..., \"text\": ...}]} з тими самими id."
+)
+
+# Промпт для інших мов цілей розсилки; український лишається як був - ключі кешу не змінюються
+LANGUAGE_PROMPT = (
+    "You are a professional translator of technical texts. Translate each text into {language}, "
+    "keeping technical terms and product names. The translation must be natural and clear. "
+    "You will receive JSON {{\"items\": [{{\"id\": ..., \"text\": ...}}]}}. "
+    "Reply only with JSON {{\"translations\": [{{\"id\": ..., \"text\": ...}}]}} with the same ids."
+)
+
+LANGUAGE_NAMES = {'en': 'English', 'de': 'German', 'pl': 'Polish', 'fr': 'French', 'es': 'Spanish'}
+
+
+def system_prompt(language='uk'):
+    if language == 'uk':
+        return BATCH_SYSTEM_PROMPT
+    return LANGUAGE_PROMPT.format(language=LANGUAGE_NAMES.get(language, language))
+
+# Помилки, після яких запит варто повторити
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+def estimate_tokens(text):
+    """Груба оцінка кількості токенів (без токенізатора)"""
+    return len(text) // 3 + 8
+
+
+class BatchTranslator:
+    """Пакетний переклад: тексти групуються за бюджетом токенів, пакети йдуть паралельно"""
+
+    def __init__(self, api_key, cache, model, temperature, settings=None):
+        settings = settings or {}
+        self.api_key = api_key
+        self.cache = cache
+        self.model = model
+        self.temperature = temperature
+        self.token_budget = settings.get('batch_token_budget', 3000)
+        self.max_concurrency = settings.get('max_concurrency', 4)
+        self.max_retries = settings.get('max_retries', 5)
+        self.backoff_base = settings.get('backoff_seconds', 1.0)
+
+    def create_client(self):
+        # Повтори робимо самі, щоб контролювати backoff
+        return openai.AsyncOpenAI(api_key=self.api_key, max_retries=0)
+
+    def cache_key(self, text, language='uk'):
+        return self.cache.make_key(text, self.model, system_prompt(language), self.temperature)
+
+    def split_batches(self, texts):
+        """Ділимо тексти на пакети, що вкладаються в бюджет токенів"""
+        batches = []
+        current = []
+        current_tokens = 0
+        for text in texts:
+            tokens = estimate_tokens(text)
+            if current and current_tokens + tokens > self.token_budget:
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _request(self, client, batch, language='uk'):
+        payload = {'items': [{'id': i, 'text': text} for i, text in enumerate(batch)]}
+        input_tokens = sum(estimate_tokens(text) for text in batch)
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt(language)},
+                        {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+                    ],
+                    # Український переклад займає помітно більше токенів за оригінал
+                    max_tokens=min(4096, input_tokens * 3 + 200),
+                    temperature=self.temperature,
+                    response_format={"type": "json_object"}
+                )
+                data = json.loads(response.choices[0].message.content)
+                return {int(item['id']): item['text'].strip() for item in data['translations']}
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_base * 2 ** attempt * random.uniform(0.5, 1.5)
+                logging.warning(f"Translation retry {attempt + 1} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+    async def _translate_batch(self, client, semaphore, batch, language='uk'):
+        async with semaphore:
+            try:
+                translated = await self._request(client, batch, language)
+            except Exception as e:
+                logging.error(f"Помилка пакетного перекладу: {e}")
+                return {}
+        results = {}
+        for i, text in enumerate(batch):
+            if translated.get(i):
+                results[text] = translated[i]
+                self.cache.put(self.cache_key(text, language), translated[i])
+        return results
+
+    async def translate_all(self, texts, client=None, language='uk', cached_only=False):
+        """Перекладає всі тексти, повертає {оригінал: переклад} (без тих, що не вдалося перекласти)
+
+        client - довгоживучий AsyncOpenAI (режим демона); без нього створюється на один виклик.
+        language - мова перекладу (за замовчуванням українська).
+        cached_only - лише те, що вже є в кеші, без запитів до API.
+        """
+        results = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            cached = self.cache.get(self.cache_key(text, language))
+            if cached is None:
+                pending.append(text)
+            else:
+                results[text] = cached
+
+        if cached_only:
+            return results
+        batches = self.split_batches(pending)
+        logging.info(f"Translation ({language}): {len(results)} cached, {len(pending)} in {len(batches)} batch(es)")
+        if batches:
+            own_client = client is None
+            if own_client:
+                client = self.create_client()
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            try:
+                for translated in await asyncio.gather(
+                        *[self._translate_batch(client, semaphore, batch, language) for batch in batches]):
+                    results.update(translated)
+            finally:
+                if own_client:
+                    await client.close()
+        return results
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Офлайн-бенчмарк повного run_once на записаних фікстурах
+
+Усі зовнішні сервіси (блоги, Reddit, OpenAI, Telegram) замінює локальний
+сервер. Кожен прогін: холодний запуск у порожній теці, теплий запуск
+поверх збереженого стану (кеші, історія надісланих), другий цикл демона
+з постійними з'єднаннями, а також окремі процеси для часу імпорту і
+"тихого" запуску, де жодна новина не проходить фільтри. Результат - медіана
+за прогонами, порівняна зі збереженою базовою лінією.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --runs 5 --save-baseline
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import subprocess
+import logging
+import argparse
+import tempfile
+import statistics
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from standin_server import StandInServer
+
+DEFAULT_SCENARIO = os.path.join(BENCH_DIR, 'scenario.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+STARTUP_PROBE = os.path.join(BENCH_DIR, 'startup_probe.py')
+
+
+def bench_config(scenario, base):
+    """Робоча конфігурація з репозиторію, перенаправлена на локальний сервер"""
+    with open(os.path.join(REPO_DIR, 'config', 'ai_news_config.json'), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config['sources']['blogs'] = [f"{base}{path}" for path in scenario['sources']]
+    config['sources']['reddit'] = scenario['subreddits']
+    config.setdefault('reddit', {})['base_url'] = base
+    config.setdefault('telegram_delivery', {})['api_base'] = base
+    # Фази порівнюють конвеєр на тих самих джерелах, тож розклад опитування і вимикач
+    # джерел (нестабільне джерело інакше випадало б з наступних фаз) вимкнено
+    config.setdefault('source_schedule', {})['enabled'] = False
+    config.setdefault('source_health', {})['enabled'] = False
+    return config
+
+
+def quiet_config(config):
+    """Та сама конфігурація, але жодна новина не проходить фільтр ключових слів"""
+    config = json.loads(json.dumps(config))
+    config['filter_criteria']['keywords'] = ['no-such-keyword-in-fixtures']
+    return config
+
+
+def bench_secrets():
+    return {
+        'OPENAI': {'secrets': {'API_KEY': 'sk-benchmark'}},
+        'TELEGRAM': {'secrets': {'BOT_TOKEN': '123456:benchmark'}}
+    }
+
+
+def prepare_workdir(root, name, config):
+    workdir = os.path.join(root, name)
+    os.makedirs(os.path.join(workdir, 'config'))
+    with open(os.path.join(workdir, 'config', 'ai_news_config.json'), 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(workdir, 'config', 'api_secrets.json'), 'w', encoding='utf-8') as f:
+        json.dump(bench_secrets(), f)
+    return workdir
+
+
+async def daemon_cycles(monitor, server, cycles):
+    """Кілька циклів демона в одному циклі подій; вимірюємо останній (теплі з'єднання)"""
+    await monitor.open_daemon_resources()
+    try:
+        for _ in range(cycles):
+            server.reset_stats()
+            started = time.perf_counter()
+            await monitor.run_once_async()
+    finally:
+        await monitor.close_daemon_resources()
+    return started
+
+
+def run_phase(monitor_module, workdir, server, scenario, daemon=False):
+    """Один run_once (або цикл демона) у заданій теці; повертає метрики етапів і сервера"""
+    os.chdir(workdir)
+    server.reset_stats()
+    monitor = monitor_module.AINewsMonitor()
+    # Продуктивний ліміт Telegram (20/хв) вимірював би лише паузи
+    monitor.telegram.rate = scenario.get('telegram', {}).get('messages_per_minute', 20) / 60
+    if daemon:
+        started = asyncio.run(daemon_cycles(monitor, server, 2))
+    else:
+        started = time.perf_counter()
+        monitor.run_once()
+    stages = {name: dict(stage) for name, stage in monitor.metrics.stages.items()}
+    stages['run_once'] = {'seconds': time.perf_counter() - started, 'items': len(server.telegram_messages)}
+    return {
+        'stages': stages,
+        'sent': len(server.telegram_messages),
+        'server': {name: dict(stats) for name, stats in server.stats.items()}
+    }
+
+
+def run_probe(mode, workdir):
+    """startup_probe.py в окремому процесі; повертає його звіт і повний час процесу"""
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, STARTUP_PROBE, mode], cwd=workdir, env=os.environ.copy(),
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['process_seconds'] = time.perf_counter() - started
+    return result
+
+
+def flatten_probe(phase, result):
+    metrics = {f"{phase}.process.seconds": result['process_seconds'],
+               f"{phase}.import.seconds": result['import_seconds'],
+               f"{phase}.lazy_modules_loaded": len(result.get('loaded_on_run', result['loaded_on_import']))}
+    if 'run_seconds' in result:
+        metrics[f"{phase}.run.seconds"] = result['run_seconds']
+    return metrics
+
+
+def flatten(phase, result):
+    metrics = {}
+    for name, stage in result['stages'].items():
+        metrics[f"{phase}.{name}.seconds"] = stage['seconds']
+        metrics[f"{phase}.{name}.items"] = stage['items']
+        if stage['seconds'] > 0:
+            metrics[f"{phase}.{name}.items_per_second"] = stage['items'] / stage['seconds']
+    metrics[f"{phase}.sent"] = result['sent']
+    for name, stats in result['server'].items():
+        metrics[f"{phase}.server.{name}.requests"] = stats['requests']
+        if stats['bytes']:
+            metrics[f"{phase}.server.{name}.bytes"] = stats['bytes']
+    return metrics
+
+
+def median_metrics(runs):
+    names = sorted({name for run in runs for name in run})
+    return {name: round(statistics.median(run.get(name, 0) for run in runs), 4) for name in names}
+
+
+def compare(current, baseline, tolerance, min_delta):
+    """Порівнюємо метрики часу з базовою лінією; повертаємо список регресій"""
+    regressions = []
+    print(f"\n{'metric':<45} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(current):
+        if not name.endswith('.seconds') or name not in baseline:
+            continue
+        before, after = baseline[name], current[name]
+        change = (after - before) / before if before else 0.0
+        flag = ''
+        if after > before * (1 + tolerance) and after - before > min_delta:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<45} {before:>10.3f} {after:>10.3f} {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline end-to-end benchmark for AI News Monitor')
+    parser.add_argument('--scenario', default=DEFAULT_SCENARIO)
+    parser.add_argument('--runs', type=int, help='number of cold+warm runs (default from scenario)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store current results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown')
+    parser.add_argument('--min-delta', type=float, default=0.05, help='ignore slowdowns below this many seconds')
+    parser.add_argument('--output', help='write the full JSON report to this file')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary working directories')
+    args = parser.parse_args()
+
+    with open(args.scenario, 'r', encoding='utf-8') as f:
+        scenario = json.load(f)
+    runs = args.runs or scenario.get('runs', 3)
+
+    server = StandInServer(scenario).start()
+    root = tempfile.mkdtemp(prefix='ai-news-bench-')
+    cwd = os.getcwd()
+    os.makedirs(os.path.join(root, 'logs'))
+    os.chdir(root)
+    os.environ['OPENAI_BASE_URL'] = f"{server.base}/v1"
+    import ai_news_monitor
+    # Лише у файл: консоль лишаємо для звіту бенчмарку
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.FileHandler(os.path.join(root, 'logs', 'ai_news.log'), encoding='utf-8')])
+
+    config = bench_config(scenario, server.base)
+    results = []
+    lazy_loaded = set()
+    try:
+        for i in range(runs):
+            workdir = prepare_workdir(root, f"run-{i}", config)
+            metrics = {}
+            for phase in ('cold', 'warm', 'daemon'):
+                result = run_phase(ai_news_monitor, workdir, server, scenario, daemon=phase == 'daemon')
+                metrics.update(flatten(phase, result))
+                print(f"run {i + 1}/{runs} {phase}: {result['stages']['run_once']['seconds']:.2f}s, "
+                      f"sent {result['sent']}")
+            startup = run_probe('import', root)
+            quiet = run_probe('run', prepare_workdir(root, f"quiet-{i}", quiet_config(config)))
+            metrics.update(flatten_probe('startup', startup))
+            metrics.update(flatten_probe('quiet', quiet))
+            lazy_loaded.update(startup['loaded_on_import'] + quiet['loaded_on_run'])
+            print(f"run {i + 1}/{runs} startup: import {startup['import_seconds']:.2f}s, "
+                  f"quiet run {quiet['process_seconds']:.2f}s")
+            results.append(metrics)
+    finally:
+        os.chdir(cwd)
+        server.stop()
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    current = median_metrics(results)
+    report = {'scenario': os.path.basename(args.scenario), 'runs': runs, 'metrics': current}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    status = 0
+    if lazy_loaded:
+        # Імпорт або тихий запуск потягнули стек перекладу/доставки
+        print(f"\nLazy modules loaded without need: {', '.join(sorted(lazy_loaded))}")
+        status = 1
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['metrics']
+        regressions = compare(current, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}")
+            status = 1
+    else:
+        for name, value in current.items():
+            print(f"{name:<45} {value:>12}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Локальний сервер-замінник для бенчмарків: джерела новин з фікстур,
+фейкові OpenAI та Telegram, штучні затримки та помилки"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from aiohttp import web
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TOPICS = ['speech recognition', 'protein design', 'code generation', 'robot control', 'weather forecasting',
+          'search ranking', 'video synthesis', 'drug discovery', 'chip layout', 'fraud detection',
+          'machine translation', 'medical imaging']
+VERBS = ['ships', 'doubles accuracy in', 'cuts the cost of', 'opens up', 'scales', 'rethinks']
+
+
+def render(template, base, now):
+    """Підставляємо адресу сервера та дати відносно поточного часу
+
+    {{base}} - адреса сервера, {{date:-N}} - RFC 822 N годин тому, {{isodate:-N}} - ISO 8601.
+    """
+    def date(hours):
+        return now + timedelta(hours=int(hours))
+
+    text = template.replace('{{base}}', base)
+    parts = text.split('{{')
+    out = [parts[0]]
+    for part in parts[1:]:
+        tag, rest = part.split('}}', 1)
+        kind, hours = tag.split(':')
+        value = format_datetime(date(hours)) if kind == 'date' else date(hours).isoformat()
+        out.append(value + rest)
+    return ''.join(out)
+
+
+def generated_title(prefix, i):
+    return f"{prefix}: {TOPICS[i % len(TOPICS)]} model {VERBS[i // len(TOPICS) % len(VERBS)]} {TOPICS[(i * 5 + 3) % len(TOPICS)]} ({i})"
+
+
+def filler_text(i, words=60):
+    """Різний для кожного запису текст, щоб записи не виглядали майже-дублікатами"""
+    rng = random.Random(i)
+    vocabulary = ' '.join(TOPICS + VERBS).split() + ['team', 'data', 'latency', 'users', 'training',
+                                                     'evaluation', 'cluster', 'partners', 'pilot', 'results']
+    return ' '.join(rng.choice(vocabulary) for _ in range(words)) + '.'
+
+
+def generate_rss(route, base, now):
+    """Великий або маленький RSS: записи від нових до старих, по одному на годину"""
+    items = []
+    for i in range(route['items']):
+        title = generated_title(route['title'], i)
+        description = f"{title}. A new release for enterprise teams. {filler_text(i)}"
+        items.append(f"<item><title>{title}</title><link>{base}/posts/{route['path'].strip('/').replace('/', '-')}-{i}</link>"
+                     f"<description>{description}</description>"
+                     f"<pubDate>{format_datetime(now - timedelta(hours=i + 1))}</pubDate></item>")
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>{route["title"]}</title>'
+            f'<link>{base}{route["path"]}</link>{"".join(items)}</channel></rss>')
+
+
+def generate_html(route, base, now):
+    """Велика HTML-сторінка зі статтями (перевищує ліміт потокового читання)"""
+    articles = []
+    for i in range(route['items']):
+        title = generated_title(route['title'], i)
+        articles.append(f'<div class="post"><h2 class="title">{title}</h2><a href="/posts/html-{i}">Read</a>'
+                        f'<p class="excerpt">{title}. A business use case. {filler_text(i)}</p></div>')
+    return f'<html><head><title>{route["title"]}</title></head><body>{"".join(articles)}</body></html>'
+
+
+GENERATORS = {'rss': generate_rss, 'html': generate_html}
+
+
+class StandInServer:
+    """aiohttp-сервер у фоновому потоці; адреса доступна як base після start()"""
+
+    def __init__(self, scenario, host='127.0.0.1', port=0):
+        self.scenario = scenario
+        self.host = host
+        self.port = port
+        self.random = random.Random(scenario.get('seed', 0))
+        self.bodies = {}
+        self.stats = {}
+        self.telegram_messages = []
+        self.loop = None
+        self.thread = None
+        self.runner = None
+
+    @property
+    def base(self):
+        return f"http://{self.host}:{self.port}"
+
+    def route_stats(self, name):
+        if name not in self.stats:
+            self.stats[name] = {'requests': 0, 'errors': 0, 'not_modified': 0, 'bytes': 0, 'seconds': 0.0}
+        return self.stats[name]
+
+    def reset_stats(self):
+        self.stats = {}
+        self.telegram_messages = []
+
+    def render_bodies(self):
+        now = datetime.now(timezone.utc)
+        for route in self.scenario['routes']:
+            if 'fixture' in route:
+                with open(os.path.join(FIXTURES_DIR, route['fixture']), 'r', encoding='utf-8') as f:
+                    body = render(f.read(), self.base, now)
+            else:
+                body = GENERATORS[route['generate']](route, self.base, now)
+            self.bodies[route['path']] = body.encode('utf-8')
+
+    async def _inject(self, settings, stats):
+        """Затримка та випадкова помилка; повертає відповідь з помилкою або None"""
+        if settings.get('latency_ms'):
+            await asyncio.sleep(settings['latency_ms'] / 1000)
+        if self.random.random() < settings.get('error_rate', 0):
+            stats['errors'] += 1
+            return web.Response(status=503, text='Service Unavailable')
+        return None
+
+    def source_handler(self, route):
+        async def handle(request):
+            started = time.perf_counter()
+            stats = self.route_stats(route['path'])
+            stats['requests'] += 1
+            try:
+                error = await self._inject(route, stats)
+                if error:
+                    return error
+                body = self.bodies[route['path']]
+                headers = {'Content-Type': route.get('content_type', 'text/html')}
+                if route.get('etag'):
+                    headers['ETag'] = '"' + hashlib.sha1(body).hexdigest() + '"'
+                    if request.headers.get('If-None-Match') == headers['ETag']:
+                        stats['not_modified'] += 1
+                        return web.Response(status=304)
+                if route.get('last_modified'):
+                    headers['Last-Modified'] = 'Mon, 01 Jan 2024 00:00:00 GMT'
+                    if request.headers.get('If-Modified-Since') == headers['Last-Modified']:
+                        stats['not_modified'] += 1
+                        return web.Response(status=304)
+                if request.method == 'HEAD':
+                    return web.Response(headers=headers)
+
+                response = web.StreamResponse(headers=headers)
+                await response.prepare(request)
+                chunk_size = route.get('chunk_kb', 64) * 1024
+                try:
+                    for offset in range(0, len(body), chunk_size):
+                        await response.write(body[offset:offset + chunk_size])
+                        stats['bytes'] += min(chunk_size, len(body) - offset)
+                    await response.write_eof()
+                except (ConnectionResetError, asyncio.CancelledError):
+                    # Клієнт перестав читати (ліміт байтів або ранній вихід парсера)
+                    pass
+                return response
+            finally:
+                stats['seconds'] += time.perf_counter() - started
+        return handle
+
+    async def post_page(self, request):
+        self.route_stats('/posts/*')['requests'] += 1
+        return web.Response(text=f"<html><body><h1>{request.match_info['slug']}</h1></body></html>",
+                            content_type='text/html')
+
+    async def moved_page(self, request):
+        self.route_stats('/moved/*')['requests'] += 1
+        raise web.HTTPMovedPermanently(f"/posts/{request.match_info['slug']}")
+
+    async def gone_page(self, request):
+        self.route_stats('/gone/*')['requests'] += 1
+        return web.Response(status=404, text='Not Found')
+
+    async def not_found(self, request):
+        self.route_stats('404')['requests'] += 1
+        return web.Response(status=404, text='Not Found')
+
+    async def openai_completions(self, request):
+        """Фейковий /v1/chat/completions: 'перекладає' додаванням префікса [uk]"""
+        started = time.perf_counter()
+        stats = self.route_stats('openai')
+        stats['requests'] += 1
+        error = await self._inject(self.scenario.get('openai', {}), stats)
+        if error:
+            return error
+        payload = await request.json()
+        user_message = payload['messages'][-1]['content']
+        if payload.get('response_format', {}).get('type') == 'json_object':
+            items = json.loads(user_message)['items']
+            content = json.dumps({'translations': [{'id': item['id'], 'text': f"[uk] {item['text']}"}
+                                                   for item in items]}, ensure_ascii=False)
+        else:
+            content = f"[uk] {user_message}"
+        stats['seconds'] += time.perf_counter() - started
+        return web.json_response({
+            'id': f"chatcmpl-{stats['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'gpt-3.5-turbo'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': len(user_message) // 3, 'completion_tokens': len(content) // 3,
+                      'total_tokens': (len(user_message) + len(content)) // 3}
+        })
+
+    async def telegram_send(self, request):
+        """Фейковий sendMessage: запам'ятовує повідомлення"""
+        stats = self.route_stats('telegram')
+        stats['requests'] += 1
+        error = await self._inject(self.scenario.get('telegram', {}), stats)
+        if error:
+            return error
+        data = await request.post()
+        self.telegram_messages.append({'chat_id': data.get('chat_id'), 'text': data.get('text'), 'at': time.time()})
+        return web.json_response({'ok': True, 'result': {'message_id': len(self.telegram_messages)}})
+
+    def app(self):
+        app = web.Application()
+        for route in self.scenario['routes']:
+            app.router.add_get(route['path'], self.source_handler(route))
+        app.router.add_get('/posts/{slug}', self.post_page)
+        app.router.add_get('/moved/{slug}', self.moved_page)
+        app.router.add_get('/gone/{slug}', self.gone_page)
+        app.router.add_post('/v1/chat/completions', self.openai_completions)
+        app.router.add_post('/bot{token}/sendMessage', self.telegram_send)
+        app.router.add_route('*', '/{tail:.*}', self.not_found)
+        return app
+
+    def _serve(self, started):
+        asyncio.set_event_loop(self.loop)
+        self.runner = web.AppRunner(self.app())
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, self.host, self.port)
+        self.loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        started.set()
+        self.loop.run_forever()
+
+    def start(self):
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self.thread = threading.Thread(target=self._serve, args=(started,), daemon=True)
+        self.thread.start()
+        started.wait()
+        self.render_bodies()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Вимірювання холодного старту в окремому процесі
+
+    python startup_probe.py import   # лише імпорт ai_news_monitor
+    python startup_probe.py run      # імпорт + run_once у поточній теці
+
+Друкує JSON: час імпорту та запуску і які з модулів, що мають
+завантажуватися ліниво, опинились у sys.modules.
+"""
+
+import os
+import sys
+import json
+import time
+
+started = time.perf_counter()
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Не потрібні, поки немає чого перекладати чи надсилати
+LAZY_MODULES = ['openai', 'requests', 'feedparser', 'translation_cache', 'batch_translator', 'telegram_delivery']
+
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'import'
+    import ai_news_monitor
+    imported = time.perf_counter()
+    result = {'import_seconds': imported - started,
+              'loaded_on_import': [name for name in LAZY_MODULES if name in sys.modules]}
+    if mode == 'run':
+        ai_news_monitor.setup_logging()
+        monitor = ai_news_monitor.AINewsMonitor()
+        monitor.run_once()
+        result['run_seconds'] = time.perf_counter() - imported
+        result['loaded_on_run'] = [name for name in LAZY_MODULES if name in sys.modules]
+    print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Мова цілі без перекладу - текст джерела як є
+ORIGINAL_LANGUAGE = 'original'
+
+LABELS = {
+    'uk': {'more': 'Детальніше', 'source': 'Джерело'},
+    'en': {'more': 'Read more', 'source': 'Source'},
+}
+
+
+def split_sentences(text, limit=5):
+    return [sentence.strip() for sentence in text.split('. ')[:limit] if sentence.strip()]
+
+
+class DeliveryTarget:
+    """Канал або група для розсилки: мова, формат повідомлення та налаштування Telegram
+
+    Надіслане фіксується окремо для кожної цілі: ключ - хеш новини з префіксом
+    назви цілі. Основна ціль (перша в списку) використовує хеші без префікса,
+    тож історія sent_news, накопичена до появи кількох цілей, лишається дійсною.
+    """
+
+    def __init__(self, settings, primary=False):
+        self.name = settings['name']
+        self.chat_id = settings['chat_id']
+        self.language = settings.get('language', 'uk')
+        self.format = settings.get('format', 'full')
+        self.max_sentences = settings.get('max_sentences', 5)
+        self.footer = settings.get('footer', '')
+        self.message_settings = settings.get('message_settings', {})
+        self.primary = primary
+
+    def sent_key(self, news_hash):
+        return news_hash if self.primary else f"{self.name}:{news_hash}"
+
+    def render(self, news, title, content):
+        """Повідомлення для цілі з уже локалізованих заголовка і тексту"""
+        labels = LABELS.get(self.language, LABELS['en'])
+        message = f"🚀 {title}\n\n"
+        if self.format == 'full':
+            for sentence in split_sentences(content, self.max_sentences):
+                message += f"• {sentence}.\n"
+            message += "\n😶😶😶\n\n"
+        message += f"🔗 {labels['more']}: {news['url']}\n"
+        message += f"📰 {labels['source']}: {news['source']}"
+        if self.footer:
+            message += f"\n\n{self.footer}"
+        return message
+
+
+def load_targets(targets, telegram_config):
+    """Цілі з конфігурації; без delivery_targets - єдина група з telegram_config"""
+    if not targets:
+        group = telegram_config['target_group']
+        targets = [{'name': group['username'].lstrip('@'), 'chat_id': group['chat_id'],
+                    'footer': f"👍 [Група](https://t.me/{group['username'].lstrip('@')})"}]
+    return [DeliveryTarget(settings, primary=index == 0) for index, settings in enumerate(targets)]
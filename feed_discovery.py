@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import re
+import time
+import logging
+from urllib.parse import urljoin, urlparse
+
+from parsing import looks_like_feed, StreamingFeedParser
+
+# Типові шляхи, за якими блоги публікують фіди
+COMMON_FEED_PATHS = ['/feed/', '/rss/', '/feed.xml', '/rss.xml', '/atom.xml', '/index.xml']
+
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml', 'application/feed+json', 'application/xml', 'text/xml')
+
+FEED_URL_PATTERN = re.compile(r'(feed|rss|atom)', re.IGNORECASE)
+
+# Для пошуку фіду вистачає початку відповіді
+PROBE_MAX_BYTES = 512 * 1024
+
+
+async def read_probe(response):
+    """Початок тіла до PROBE_MAX_BYTES; StreamReader.read(n) віддає лише вже отримане в буфері"""
+    chunks = []
+    received = 0
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        chunks.append(chunk[:PROBE_MAX_BYTES - received])
+        received += len(chunks[-1])
+        if received >= PROBE_MAX_BYTES:
+            break
+    return b''.join(chunks)
+
+
+def is_feed(body):
+    """Чи є відповідь фідом з хоча б одним записом"""
+    if not body or not looks_like_feed(body):
+        return False
+    parser = StreamingFeedParser('', limit=1)
+    parser.feed(body)
+    return parser.is_feed and parser.entries_seen > 0
+
+
+def extract_alternate_feeds(html, base_url):
+    """Шукаємо <link rel="alternate"> з типом фіду"""
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(html, 'lxml', parse_only=SoupStrainer('link'))
+    feeds = []
+    for link in soup.find_all('link', href=True):
+        rel = link.get('rel') or []
+        if isinstance(rel, str):
+            rel = rel.split()
+        if 'alternate' in rel and link.get('type', '').lower() in FEED_TYPES:
+            feeds.append(urljoin(base_url, link['href']))
+    return feeds
+
+
+def extract_sitemaps(robots_txt, base_url):
+    """Адреси sitemap з robots.txt (або типова /sitemap.xml)"""
+    sitemaps = []
+    for line in robots_txt.splitlines():
+        if line.lower().startswith('sitemap:'):
+            sitemaps.append(line.split(':', 1)[1].strip())
+    return sitemaps or [urljoin(base_url, '/sitemap.xml')]
+
+
+def extract_sitemap_feeds(sitemap_xml):
+    """Посилання з sitemap, схожі на фіди"""
+    locs = re.findall(r'<loc>\s*([^<\s]+)\s*</loc>', sitemap_xml)
+    return [loc for loc in locs if FEED_URL_PATTERN.search(urlparse(loc).path)]
+
+
+class FeedRegistry:
+    """Реєстр знайдених фідів для кожного джерела з періодичною перевіркою"""
+
+    # Результат пошуку, коли сама сторінка джерела недоступна (помилка з'єднання, тайм-аут, 5xx)
+    UNREACHABLE = object()
+
+    def __init__(self, settings=None, registry_file='./data/feed_registry.json'):
+        settings = settings or {}
+        self.registry_file = registry_file
+        self.revalidate_after = settings.get('revalidate_days', 7) * 86400
+        self.max_sitemap_candidates = settings.get('max_sitemap_candidates', 3)
+        self.timeout = settings.get('timeout', 10)
+        self._http_session = None
+        self.entries = self.load()
+
+    @property
+    def http_session(self):
+        """Синхронний пошук фідів потрібен рідко - requests імпортуємо при першому зверненні"""
+        if self._http_session is None:
+            import requests
+            self._http_session = requests.Session()
+        return self._http_session
+
+    def load(self):
+        """Завантажуємо реєстр"""
+        if not os.path.exists(self.registry_file):
+            return {}
+        try:
+            with open(self.registry_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.registry_file}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігаємо реєстр"""
+        tmp_file = f"{self.registry_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_file, self.registry_file)
+
+    def lookup(self, source_url):
+        """Повертає актуальний запис для джерела або None"""
+        entry = self.entries.get(source_url)
+        if entry and time.time() - entry['checked_at'] < self.revalidate_after:
+            return entry
+        return None
+
+    def invalidate(self, source_url):
+        """Примусова повторна перевірка джерела при наступному запуску"""
+        self.entries.pop(source_url, None)
+
+    def record(self, source_url, found):
+        if found is self.UNREACHABLE:
+            # Збій мережі чи сервера - не висновок про відсутність фіду: HTML лише на цей запуск
+            logging.warning(f"Feed discovery {source_url}: source unreachable, using html for this run")
+            return {'strategy': 'html', 'feed_url': None, 'method': None}
+        if found:
+            feed_url, method = found
+            entry = {'strategy': 'feed', 'feed_url': feed_url, 'method': method}
+        else:
+            entry = {'strategy': 'html', 'feed_url': None, 'method': None}
+        entry['checked_at'] = time.time()
+        self.entries[source_url] = entry
+        logging.info(f"Feed discovery {source_url}: {entry['strategy']} {entry['feed_url'] or ''}")
+        return entry
+
+    def _probe_plan(self, source_url):
+        """Кроки пошуку фіду: віддає URL для завантаження, отримує (status, body)"""
+        status, body = yield source_url
+        unreachable = status is None or status >= 500
+        candidates = []
+        if status == 200 and body:
+            if is_feed(body):
+                return source_url, 'self'
+            candidates += [(feed, 'link-alternate') for feed in extract_alternate_feeds(body, source_url)]
+        candidates += [(f"{source_url.rstrip('/')}{path}", 'common-path') for path in COMMON_FEED_PATHS]
+
+        tried = set()
+        for candidate, method in candidates:
+            if candidate in tried:
+                continue
+            tried.add(candidate)
+            status, body = yield candidate
+            if status == 200 and is_feed(body):
+                return candidate, method
+
+        # Остання спроба - фіди, перелічені в sitemap
+        status, body = yield urljoin(source_url, '/robots.txt')
+        robots_txt = body.decode('utf-8', 'ignore') if status == 200 and body else ''
+        for sitemap_url in extract_sitemaps(robots_txt, source_url)[:2]:
+            status, body = yield sitemap_url
+            if status != 200 or not body:
+                continue
+            feeds = extract_sitemap_feeds(body.decode('utf-8', 'ignore'))
+            for candidate in feeds[:self.max_sitemap_candidates]:
+                if candidate in tried:
+                    continue
+                tried.add(candidate)
+                status, body = yield candidate
+                if status == 200 and is_feed(body):
+                    return candidate, 'sitemap'
+        return self.UNREACHABLE if unreachable else None
+
+    def resolve(self, source_url, timeout=None):
+        """Синхронно повертає стратегію для джерела, за потреби шукаючи фід
+        (timeout - тайм-аут джерела замість загального)"""
+        entry = self.lookup(source_url)
+        if entry:
+            return entry
+        timeout = min(timeout or self.timeout, self.timeout)
+        plan = self._probe_plan(source_url)
+        try:
+            target = next(plan)
+            while True:
+                try:
+                    with self.http_session.get(target, timeout=timeout, stream=True) as response:
+                        result = (response.status_code, response.raw.read(PROBE_MAX_BYTES, decode_content=True))
+                except Exception:
+                    result = (None, None)
+                target = plan.send(result)
+        except StopIteration as stop:
+            return self.record(source_url, stop.value)
+
+    async def resolve_async(self, session, source_url, timeout=None):
+        """Асинхронно повертає стратегію для джерела, за потреби шукаючи фід"""
+        entry = self.lookup(source_url)
+        if entry:
+            return entry
+        timeout = min(timeout or self.timeout, self.timeout)
+        plan = self._probe_plan(source_url)
+        try:
+            target = next(plan)
+            while True:
+                try:
+                    async with session.get(target, timeout=timeout) as response:
+                        result = (response.status, await read_probe(response))
+                except Exception:
+                    result = (None, None)
+                target = plan.send(result)
+        except StopIteration as stop:
+            return self.record(source_url, stop.value)
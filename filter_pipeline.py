@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import asyncio
+import logging
+import importlib
+
+from near_duplicates import collapse_clusters
+
+
+def search_text(news):
+    """Текст новини для пошуку ключових слів"""
+    return f"{news['title']} {news['content']}".lower()
+
+
+def news_hashes(news):
+    """Хеш новини разом з хешами її попередніх форм URL (до канонізації та редиректів)"""
+    return [news['hash']] + news.get('hash_aliases', [])
+
+
+class FilterStage:
+    """Базовий етап фільтрації новин"""
+
+    name = 'stage'
+    # Відносна вартість етапу: дешеві етапи виконуються першими
+    cost = 1
+    # Відкинуті етапом новини лише відкладено (не відхилено) - вони повернуться наступного запуску
+    defers = False
+
+    def __init__(self, monitor, settings):
+        self.monitor = monitor
+        self.settings = settings
+        # Новини, які етап не встиг перевірити до дедлайну запуску: відкладаються за будь-якого defers
+        self.postponed = []
+
+    def check(self, news):
+        """Чи проходить новина цей етап"""
+        return True
+
+    def apply(self, news_list):
+        """Пропускаємо через етап увесь список (етапи можуть перевизначати для пакетної обробки)"""
+        return [news for news in news_list if self.check(news)]
+
+    async def apply_async(self, news_list, session=None):
+        """Варіант для циклу подій; мережеві етапи перевизначають його і використовують session"""
+        return self.apply(news_list)
+
+
+class BlockedHashStage(FilterStage):
+    name = 'blocked_hashes'
+    cost = 0
+
+    def __init__(self, monitor, settings):
+        super().__init__(monitor, settings)
+        self.blocked = set(settings.get('blocked_hashes', []))
+
+    def check(self, news):
+        return not any(news_hash in self.blocked for news_hash in news_hashes(news))
+
+
+class DuplicateStage(FilterStage):
+    name = 'duplicate'
+    cost = 0
+
+    def check(self, news):
+        return not self.monitor.is_sent(news)
+
+
+class ExcludeKeywordsStage(FilterStage):
+    name = 'exclude_keywords'
+    cost = 2
+
+    def __init__(self, monitor, settings):
+        super().__init__(monitor, settings)
+        self.keywords = [keyword.lower() for keyword in settings.get('exclude_keywords', [])]
+
+    def check(self, news):
+        text = search_text(news)
+        return not any(keyword in text for keyword in self.keywords)
+
+
+class MinLengthStage(FilterStage):
+    name = 'min_length'
+    cost = 0
+
+    def check(self, news):
+        return len(news['content']) >= self.settings.get('min_length', 100)
+
+
+class IncludeKeywordsStage(FilterStage):
+    name = 'include_keywords'
+    cost = 2
+
+    def __init__(self, monitor, settings):
+        super().__init__(monitor, settings)
+        self.keywords = [keyword.lower() for keyword in settings.get('keywords', [])]
+
+    def check(self, news):
+        text = search_text(news)
+        return any(keyword in text for keyword in self.keywords)
+
+
+class NearDuplicateStage(FilterStage):
+    name = 'near_duplicate'
+    # Дорожче за ключові слова, але має відпрацювати до мережевої перевірки та перекладу
+    cost = 5
+
+    def apply(self, news_list):
+        index = self.monitor.near_duplicates
+        survivors = []
+        for news, signatures in collapse_clusters(news_list, index):
+            if index.seen_before(signatures):
+                continue
+            survivors.append(news)
+        return survivors
+
+
+class RelevanceStage(FilterStage):
+    name = 'relevance'
+    # Після всіх локальних перевірок, але до мережевої перевірки та перекладу
+    cost = 50
+    defers = True
+
+    def apply(self, news_list):
+        scorer = self.monitor.relevance
+        selected = scorer.top(news_list, self.settings.get('candidates'))
+        selected_ids = {id(news) for news in selected}
+        scorer.log_scores(selected, [news for news in news_list if id(news) not in selected_ids])
+        return selected
+
+
+class UrlValidityStage(FilterStage):
+    name = 'url_validity'
+    cost = 100
+
+    def apply(self, news_list):
+        return asyncio.run(self.apply_async(news_list))
+
+    async def apply_async(self, news_list, session=None):
+        # Мережева перевірка - лише для тих, хто пройшов усі інші етапи, і всіх разом
+        validator = self.monitor.url_validator
+        urls = [news['url'] for news in news_list]
+        try:
+            validity = await self.monitor.budget.wait_for('validate', validator.validate_many(urls, session))
+        except asyncio.TimeoutError:
+            # Дедлайн: перевірене до скасування вже в кеші, решту відкладаємо до наступного запуску
+            validity = {url: validator.get_cached(url) for url in urls}
+            self.postponed = [news for news in news_list if validity[news['url']] is None]
+            logging.warning(f"URL validation cut short: {len(self.postponed)} news postponed")
+        validator.save_cache()
+        survivors = [news for news in news_list if validity[news['url']]]
+        # Редиректи, помічені під час перевірки, уточнюють канонічний URL і хеш
+        canonicalizer = self.monitor.url_canon
+        for source_url, final_url in validator.redirects.items():
+            canonicalizer.record(source_url, final_url)
+        validator.redirects.clear()
+        canonicalizer.save()
+        for news in survivors:
+            self.monitor.assign_canonical_url(news)
+        # Кінцева адреса могла вже бути надіслана раніше
+        return [news for news in survivors if not self.monitor.is_sent(news)]
+
+
+STAGES = {stage.name: stage for stage in (
+    BlockedHashStage,
+    DuplicateStage,
+    ExcludeKeywordsStage,
+    MinLengthStage,
+    IncludeKeywordsStage,
+    NearDuplicateStage,
+    RelevanceStage,
+    UrlValidityStage,
+)}
+
+DEFAULT_PIPELINE = ['blocked_hashes', 'duplicate', 'exclude_keywords', 'min_length', 'include_keywords', 'near_duplicate',
+                    'relevance', 'url_validity']
+
+
+def load_stage_class(name):
+    """Вбудований етап за назвою або власний клас у форматі 'module:Class'"""
+    if name in STAGES:
+        return STAGES[name]
+    if ':' not in name:
+        raise ValueError(f"Unknown filter stage: {name}")
+    module_name, class_name = name.split(':', 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class FilterPipeline:
+    """Конвеєр фільтрів: дешеві перевірки спочатку, дорогі - лише для тих, хто вижив"""
+
+    def __init__(self, monitor, criteria):
+        self.stages = []
+        for spec in criteria.get('pipeline', DEFAULT_PIPELINE):
+            if isinstance(spec, str):
+                spec = {'stage': spec}
+            # Параметри етапу доповнюють загальні критерії фільтрації
+            settings = dict(criteria)
+            settings.update(spec)
+            self.stages.append(load_stage_class(spec['stage'])(monitor, settings))
+        # sorted стабільний - при однаковій вартості зберігається порядок з конфігурації
+        self.stages.sort(key=lambda stage: stage.cost)
+        self.stats = {}
+        self.deferred = []
+
+    def record(self, stage, survivors, passed, elapsed):
+        passed_ids = {id(news) for news in passed}
+        postponed_ids = {id(news) for news in stage.postponed}
+        for news in survivors:
+            if id(news) not in passed_ids:
+                logging.debug(f"❌ {stage.name}: {news['title'][:50]}")
+                if stage.defers or id(news) in postponed_ids:
+                    self.deferred.append(news)
+
+        self.stats[stage.name] = {
+            'passed': len(passed),
+            'dropped': len(survivors) - len(passed),
+            'seconds': round(elapsed, 4)
+        }
+
+    def run(self, news_list):
+        survivors = news_list
+        for stage in self.stages:
+            started = time.perf_counter()
+            passed = stage.apply(survivors) if survivors else []
+            self.record(stage, survivors, passed, time.perf_counter() - started)
+            survivors = passed
+        return survivors
+
+    async def run_async(self, news_list, session=None):
+        """Той самий конвеєр у циклі подій, мережеві етапи використовують спільну сесію"""
+        survivors = news_list
+        for stage in self.stages:
+            started = time.perf_counter()
+            passed = await stage.apply_async(survivors, session) if survivors else []
+            self.record(stage, survivors, passed, time.perf_counter() - started)
+            survivors = passed
+        return survivors
+
+    def log_stats(self):
+        for name, stats in self.stats.items():
+            logging.info(f"Filter {name}: passed {stats['passed']}, "
+                         f"dropped {stats['dropped']}, {stats['seconds']:.3f}s")
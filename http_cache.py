@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+import hashlib
+import logging
+
+
+class HttpCache:
+    """Дисковий кеш HTTP-відповідей з умовними запитами (ETag / Last-Modified)"""
+
+    NOT_MODIFIED = 304
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, cache_dir='./data/http_cache', settings=None):
+        settings = settings or {}
+        self.cache_dir = cache_dir
+        # Записи, що давно не використовувались (зокрема сторінки Reddit з курсором after=,
+        # який щоразу інший), видаляються разом з тілами
+        self.max_age = settings.get('max_age_days', 7) * 86400
+        self.max_entries = settings.get('max_entries', 1000)
+        self.index_file = os.path.join(cache_dir, 'index.json')
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self.load_index()
+        self.not_modified = 0
+        self.downloaded = 0
+        self.bytes_downloaded = 0
+        # Синхронні запити повторно використовують з'єднання
+        self._http_session = None
+
+    @property
+    def http_session(self):
+        """Сесія для синхронних get/stream; асинхронний запуск requests не імпортує"""
+        if self._http_session is None:
+            import requests
+            self._http_session = requests.Session()
+        return self._http_session
+
+    def load_index(self):
+        """Завантажуємо індекс валідаторів"""
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.index_file}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігаємо індекс валідаторів (після видалення застарілих записів)"""
+        self.evict()
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, separators=(',', ':'))
+        os.replace(tmp_file, self.index_file)
+        logging.info(f"HTTP cache: {self.not_modified} not modified, {self.downloaded} downloaded "
+                     f"({self.bytes_downloaded / 1024:.0f} KB)")
+
+    def evict(self, now=None):
+        """Видаляємо записи, не використані max_age, і найдавніші понад max_entries;
+        повертаємо кількість видалених"""
+        now = now or time.time()
+
+        def used_at(url):
+            entry = self.index[url]
+            return entry.get('used_at', entry['stored_at'])
+
+        fresh = sorted((url for url in self.index if now - used_at(url) <= self.max_age), key=used_at)
+        kept = set(fresh[max(0, len(fresh) - self.max_entries):])
+        stale = [url for url in self.index if url not in kept]
+        for url in stale:
+            del self.index[url]
+        # Тіла без запису в індексі: видалені вище, без валідаторів чи після збою до save()
+        known = {os.path.basename(self._body_path(url)) for url in self.index}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.body') and name not in known:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+        if stale:
+            logging.info(f"HTTP cache: evicted {len(stale)} entries")
+        return len(stale)
+
+    def touch(self, url):
+        """Відповідь 304: запис живий і використовується"""
+        if url in self.index:
+            self.index[url]['used_at'] = time.time()
+
+    def _body_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest() + '.body')
+
+    def conditional_headers(self, url, headers=None):
+        """Додаємо If-None-Match / If-Modified-Since до заголовків запиту"""
+        headers = dict(headers or {})
+        entry = self.index.get(url)
+        if entry and os.path.exists(self._body_path(url)):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, response_headers, body):
+        """Запам'ятовуємо валідатори та тіло відповіді"""
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if not etag and not last_modified:
+            # Без валідаторів умовний запит неможливий - нічого не зберігаємо
+            self.index.pop(url, None)
+            return
+        with open(self._body_path(url), 'wb') as f:
+            f.write(body)
+        self.index[url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time()
+        }
+
+    def load_body(self, url):
+        """Повертає збережене тіло відповіді або None"""
+        try:
+            with open(self._body_path(url), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def replay(self, url, consumer=None):
+        """Збережене тіло для 304: віддаємо його consumer шматками, як під час завантаження"""
+        body = self.load_body(url)
+        if body is not None and consumer:
+            for start in range(0, len(body), self.CHUNK_SIZE):
+                if consumer(body[start:start + self.CHUNK_SIZE]):
+                    break
+        return body
+
+    def get(self, url, headers=None, timeout=15, replay=False):
+        """Синхронний умовний GET, повертає (status, body)
+
+        Для 304 body = None, а з replay=True - збережене тіло: у джерела лишились
+        необроблені записи, і їх треба прочитати знову.
+        """
+        response = self.http_session.get(url, headers=self.conditional_headers(url, headers), timeout=timeout)
+        if response.status_code == self.NOT_MODIFIED:
+            self.not_modified += 1
+            self.touch(url)
+            return response.status_code, self.replay(url) if replay else None
+        if response.status_code == 200:
+            self.downloaded += 1
+            self.store(url, response.headers, response.content)
+        self.bytes_downloaded += len(response.content)
+        return response.status_code, response.content
+
+    async def get_async(self, session, url, headers=None, timeout=15, replay=False):
+        """Асинхронний умовний GET, повертає (status, body); 304 - як у get"""
+        async with session.get(url, headers=self.conditional_headers(url, headers), timeout=timeout) as response:
+            if response.status == self.NOT_MODIFIED:
+                self.not_modified += 1
+                self.touch(url)
+                return response.status, self.replay(url) if replay else None
+            body = await response.read()
+            if response.status == 200:
+                self.downloaded += 1
+                self.store(url, response.headers, body)
+            self.bytes_downloaded += len(body)
+            return response.status, body
+
+    def _take(self, chunks, received, chunk, max_bytes):
+        """Додаємо шматок з урахуванням ліміту; повертаємо (received, truncated)"""
+        if received + len(chunk) > max_bytes:
+            chunks.append(chunk[:max_bytes - received])
+            return max_bytes, True
+        chunks.append(chunk)
+        return received + len(chunk), False
+
+    def stream(self, url, consumer=None, max_bytes=2 * 1024 * 1024, headers=None, timeout=15, replay=False):
+        """Синхронне потокове завантаження: не більше max_bytes, consumer(chunk) -> True зупиняє читання
+
+        Повертає (status, body, truncated); body - лише прочитана частина.
+        Для 304 з replay=True consumer отримує збережене тіло.
+        """
+        with self.http_session.get(url, headers=self.conditional_headers(url, headers), timeout=timeout,
+                                   stream=True) as response:
+            if response.status_code == self.NOT_MODIFIED:
+                self.not_modified += 1
+                self.touch(url)
+                return response.status_code, self.replay(url, consumer) if replay else None, False
+            chunks = []
+            received = 0
+            truncated = False
+            for chunk in response.iter_content(self.CHUNK_SIZE):
+                received, truncated = self._take(chunks, received, chunk, max_bytes)
+                if (consumer and consumer(chunks[-1])) or truncated:
+                    break
+            body = b''.join(chunks)
+            if response.status_code == 200:
+                self.downloaded += 1
+                self.store(url, response.headers, body)
+            self.bytes_downloaded += len(body)
+            return response.status_code, body, truncated
+
+    async def stream_async(self, session, url, consumer=None, max_bytes=2 * 1024 * 1024, headers=None, timeout=15,
+                           replay=False):
+        """Асинхронне потокове завантаження: не більше max_bytes, consumer(chunk) -> True зупиняє читання
+
+        Повертає (status, body, truncated); body - лише прочитана частина. 304 - як у stream.
+        """
+        async with session.get(url, headers=self.conditional_headers(url, headers), timeout=timeout) as response:
+            if response.status == self.NOT_MODIFIED:
+                self.not_modified += 1
+                self.touch(url)
+                return response.status, self.replay(url, consumer) if replay else None, False
+            chunks = []
+            received = 0
+            truncated = False
+            async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                received, truncated = self._take(chunks, received, chunk, max_bytes)
+                if (consumer and consumer(chunks[-1])) or truncated:
+                    break
+            body = b''.join(chunks)
+            if response.status == 200:
+                self.downloaded += 1
+                self.store(url, response.headers, body)
+            self.bytes_downloaded += len(body)
+            return response.status, body, truncated
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import json
+import os
+import time
+import hashlib
+import logging
+
+SIGNATURE_BITS = 64
+
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+URL_PATTERN = re.compile(r'https?://\S+')
+
+
+def tokenize(text):
+    """Нормалізований текст -> слова (без посилань, пунктуації та регістру)
+
+    Односимвольні слова лишаються: у "GPT-4" чи "GPT-4o" саме вони відрізняють релізи.
+    """
+    text = URL_PATTERN.sub(' ', text.lower())
+    return WORD_PATTERN.findall(text)
+
+
+def version_key(tokens):
+    """Слова з цифрами (номери версій, моделей, років) - заголовки з різними не дублікати"""
+    return ' '.join(sorted({token for token in tokens if any(char.isdigit() for char in token)}))
+
+
+def shingles(tokens, size):
+    return [' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(features):
+    """64-бітний SimHash набору ознак (None, якщо ознак немає)"""
+    if not features:
+        return None
+    weights = [0] * SIGNATURE_BITS
+    for feature in features:
+        value = _feature_hash(feature)
+        for bit in range(SIGNATURE_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    signature = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            signature |= 1 << bit
+    return signature
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def signatures(news, min_body_tokens=20):
+    """Підписи заголовка (слова та пари слів) і тексту (шингли з трьох слів),
+    довжина заголовка в словах та його версійні слова"""
+    title_tokens = tokenize(news['title'])
+    body_tokens = tokenize(news['content'])
+    title_signature = simhash(title_tokens + shingles(title_tokens, 2))
+    # Короткий текст (наприклад, пост-посилання з Reddit) дає ненадійний підпис
+    body_signature = simhash(shingles(body_tokens, 3)) if len(body_tokens) >= min_body_tokens else None
+    return title_signature, body_signature, len(title_tokens), version_key(title_tokens)
+
+
+class SimHashLSH:
+    """LSH-індекс: підпис ділиться на смуги; будь-які два підписи з відстанню
+    не більше max_distance мають хоча б одну спільну смугу (bands > max_distance)"""
+
+    def __init__(self, max_distance, bands):
+        if bands <= max_distance:
+            raise ValueError("bands must be greater than max_distance")
+        self.max_distance = max_distance
+        self.bands = bands
+        self.band_bits = SIGNATURE_BITS // bands
+        self.buckets = {}
+
+    def _keys(self, signature):
+        mask = (1 << self.band_bits) - 1
+        return [(band, signature >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def add(self, key, signature):
+        for band_key in self._keys(signature):
+            self.buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key, signature):
+        for band_key in self._keys(signature):
+            bucket = self.buckets.get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[band_key]
+
+    def candidates(self, signature):
+        found = set()
+        for band_key in self._keys(signature):
+            found |= self.buckets.get(band_key, set())
+        return found
+
+
+class NearDuplicateIndex:
+    """Індекс майже-дублікатів між джерелами та запусками (SimHash + LSH)
+
+    Зберігає підписи надісланих новин поруч з базою надісланих, з обмеженням
+    кількості записів та видаленням за часом.
+    """
+
+    def __init__(self, settings=None, index_file='./data/near_duplicates.json'):
+        settings = settings or {}
+        self.index_file = index_file
+        self.title_distance = settings.get('title_max_distance', 3)
+        self.body_distance = settings.get('body_max_distance', 6)
+        self.min_body_tokens = settings.get('min_body_tokens', 20)
+        # Коротший заголовок збігається лише повністю (відстань 0), інакше вирішує текст
+        self.short_title_tokens = settings.get('short_title_tokens', 6)
+        self.ttl = settings.get('ttl_days', 30) * 86400
+        self.max_entries = settings.get('max_entries', 5000)
+        self.entries = {}
+        self.title_lsh = SimHashLSH(self.title_distance, 4)
+        self.body_lsh = SimHashLSH(self.body_distance, 8)
+        self.next_key = 0
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                rows = json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.index_file}: {e}")
+            return
+        for title_signature, body_signature, added, *title_info in rows:
+            # Рядки старого формату - без довжини та версій заголовка
+            title_length, versions = title_info or (None, None)
+            self._insert((title_signature, body_signature, title_length, versions), added)
+        self.evict()
+
+    def save(self):
+        self.evict()
+        rows = sorted(self.entries.values(), key=lambda entry: entry[2])
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, separators=(',', ':'))
+        os.replace(tmp_file, self.index_file)
+
+    def _insert(self, news_signatures, added):
+        title_signature, body_signature, title_length, versions = news_signatures
+        key = self.next_key
+        self.next_key += 1
+        self.entries[key] = (title_signature, body_signature, added, title_length, versions)
+        if title_signature is not None:
+            self.title_lsh.add(key, title_signature)
+        if body_signature is not None:
+            self.body_lsh.add(key, body_signature)
+
+    def _remove(self, key):
+        title_signature, body_signature, *_ = self.entries.pop(key)
+        if title_signature is not None:
+            self.title_lsh.remove(key, title_signature)
+        if body_signature is not None:
+            self.body_lsh.remove(key, body_signature)
+
+    def evict(self):
+        """Видаляємо застарілі записи та найстаріші понад ліміт"""
+        cutoff = time.time() - self.ttl
+        for key in [key for key, entry in self.entries.items() if entry[2] < cutoff]:
+            self._remove(key)
+        overflow = len(self.entries) - self.max_entries
+        if overflow > 0:
+            for key in sorted(self.entries, key=lambda key: self.entries[key][2])[:overflow]:
+                self._remove(key)
+
+    def signatures(self, news):
+        return signatures(news, self.min_body_tokens)
+
+    def title_limit(self, first, second):
+        """Допустима відстань заголовків; None - заголовки порівнювати не можна"""
+        (title_a, _, length_a, versions_a), (title_b, _, length_b, versions_b) = first, second
+        if title_a is None or title_b is None:
+            return None
+        # "GPT-4" і "GPT-5" відрізняються одним словом - за заголовком це різні новини
+        if versions_a is not None and versions_b is not None and versions_a != versions_b:
+            return None
+        lengths = [length for length in (length_a, length_b) if length is not None]
+        if lengths and min(lengths) < self.short_title_tokens:
+            return 0
+        return self.title_distance
+
+    def is_near(self, first, second):
+        """Чи є два набори підписів майже-дублікатами
+
+        Якщо є обидва тіла, вирішують вони: дайджести й changelog'и повторюють
+        заголовок ("This week in AI") з новим змістом.
+        """
+        body_a, body_b = first[1], second[1]
+        if body_a is not None and body_b is not None:
+            return hamming(body_a, body_b) <= self.body_distance
+        limit = self.title_limit(first, second)
+        return limit is not None and hamming(first[0], second[0]) <= limit
+
+    def seen_before(self, news_signatures):
+        """Чи схожа новина на вже надіслану раніше"""
+        title_signature, body_signature = news_signatures[:2]
+        candidates = set()
+        if title_signature is not None:
+            candidates |= self.title_lsh.candidates(title_signature)
+        if body_signature is not None:
+            candidates |= self.body_lsh.candidates(body_signature)
+        return any(self.is_near(news_signatures, self.stored(key)) for key in candidates)
+
+    def stored(self, key):
+        title_signature, body_signature, _, title_length, versions = self.entries[key]
+        return title_signature, body_signature, title_length, versions
+
+    def add(self, news):
+        """Запам'ятовуємо надіслану новину"""
+        self._insert(self.signatures(news), time.time())
+
+
+def representative_rank(news):
+    """Чим більше значення, тим краще новина представляє кластер"""
+    is_blog = not news['source'].startswith('reddit-')
+    has_date = news.get('published') not in (None, 'Unknown', 'Recent')
+    return (is_blog, has_date, len(news['content']))
+
+
+def collapse_clusters(news_list, index):
+    """Об'єднуємо майже-дублікати в межах запуску, лишаючи найкращого представника кластера"""
+    items = [(news, index.signatures(news)) for news in news_list]
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # LSH у межах запуску - порівнюємо лише кандидатів зі спільними смугами
+    title_lsh = SimHashLSH(index.title_distance, 4)
+    body_lsh = SimHashLSH(index.body_distance, 8)
+    for i, (news, (title_signature, body_signature, *_)) in enumerate(items):
+        candidates = set()
+        if title_signature is not None:
+            candidates |= title_lsh.candidates(title_signature)
+            title_lsh.add(i, title_signature)
+        if body_signature is not None:
+            candidates |= body_lsh.candidates(body_signature)
+            body_lsh.add(i, body_signature)
+        for j in candidates:
+            if index.is_near(items[i][1], items[j][1]):
+                parent[find(i)] = find(j)
+
+    clusters = {}
+    for i in range(len(items)):
+        clusters.setdefault(find(i), []).append(items[i])
+    representatives = []
+    for members in clusters.values():
+        best, best_signatures = max(members, key=lambda member: representative_rank(member[0]))
+        best['cluster_size'] = len(members)
+        best['cluster_sources'] = sorted({news['source'] for news, _ in members})
+        representatives.append((best, best_signatures))
+    # Зберігаємо вихідний порядок джерел
+    order = {id(news): position for position, news in enumerate(news_list)}
+    representatives.sort(key=lambda item: order[id(item[0])])
+    return representatives
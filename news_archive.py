@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Архів надісланих новин: стиснуті JSONL-сегменти з ротацією за розміром
+та SQLite-індекс за хешем, датою і джерелом
+
+    python news_archive.py stats
+    python news_archive.py export --date 2025-08-27 --out ./exports
+    python news_archive.py export --hash d111de5e... --source openai.com
+"""
+
+import os
+import gzip
+import json
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+
+# Поля новини, що потрапляють в архів (якщо є)
+NEWS_FIELDS = ['hash', 'hash_aliases', 'title', 'content', 'url', 'canonical_url', 'original_url', 'source',
+               'source_url', 'published', 'entry_id', 'title_ua', 'content_ua', 'translations', 'score', 'score_parts',
+               'cluster_sources']
+
+
+def make_record(news, message, status, delivery=None):
+    """Запис архіву: вихідні поля, переклад, повідомлення і статус доставки"""
+    record = {field: news[field] for field in NEWS_FIELDS if field in news}
+    record['message'] = message
+    record['status'] = status
+    record['archived_at'] = datetime.now().isoformat(timespec='seconds')
+    if delivery:
+        record['delivery'] = delivery
+    return record
+
+
+def render_markdown(record):
+    """Попередній вигляд news_*.md для експорту"""
+    archived_at = datetime.fromisoformat(record['archived_at'])
+    return (f"# AI News - {archived_at.strftime('%Y-%m-%d %H:%M')}\n\n"
+            f"{record.get('message', '')}"
+            f"\n\n---\n"
+            f"Original Title: {record['title']}\n"
+            f"Source: {record['source']}\n"
+            f"URL: {record['url']}\n"
+            f"Status: {record['status']}\n")
+
+
+class NewsArchive:
+    """Дозапис записів у сегменти segment-NNNNNN.jsonl.gz; новий сегмент - коли
+    поточний перевищив max_segment_kb. Кожен дозапис - окремий gzip-член, а
+    індекс зберігає сегмент, зсув члена і рядок у ньому: пошук розпаковує лише
+    потрібні члени, а не весь архів."""
+
+    def __init__(self, settings=None, archive_dir='./data/archive'):
+        settings = settings or {}
+        self.archive_dir = settings.get('dir', archive_dir)
+        self.max_segment_bytes = settings.get('max_segment_kb', 1024) * 1024
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(self.archive_dir, 'index.db'))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "hash TEXT NOT NULL, date TEXT NOT NULL, source TEXT NOT NULL, status TEXT NOT NULL, "
+            "segment TEXT NOT NULL, member_offset INTEGER NOT NULL, line INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS records_hash ON records (hash)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS records_date ON records (date)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS records_source ON records (source)")
+        self.conn.commit()
+
+    def segment_path(self, segment):
+        return os.path.join(self.archive_dir, segment)
+
+    def current_segment(self):
+        """Останній сегмент, або наступний, якщо він заповнений"""
+        segments = sorted(name for name in os.listdir(self.archive_dir) if name.startswith('segment-'))
+        if not segments:
+            return 'segment-000001.jsonl.gz'
+        segment = segments[-1]
+        if os.path.getsize(self.segment_path(segment)) < self.max_segment_bytes:
+            return segment
+        number = int(segment.split('-')[1].split('.')[0]) + 1
+        return f"segment-{number:06d}.jsonl.gz"
+
+    def append_many(self, records):
+        """Дописуємо записи одним gzip-членом і індексуємо їх; повертаємо шлях сегмента"""
+        if not records:
+            return None
+        segment = self.current_segment()
+        path = self.segment_path(segment)
+        # Зсув беремо з розміру файлу: незавершений раніше запис не зсуне індекс
+        member_offset = os.path.getsize(path) if os.path.exists(path) else 0
+        payload = ''.join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+                          for record in records)
+        with open(path, 'ab') as f:
+            f.write(gzip.compress(payload.encode('utf-8')))
+        rows = [(record.get('hash', ''), record['archived_at'][:10], record.get('source', ''), record['status'],
+                 segment, member_offset, line) for line, record in enumerate(records)]
+        self.conn.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+        logging.info(f"Archived {len(records)} news to {segment}")
+        return path
+
+    def append(self, record):
+        return self.append_many([record])
+
+    def find(self, news_hash=None, date=None, source=None, status=None):
+        """Записи за індексом; розпаковуються лише gzip-члени, де вони лежать"""
+        conditions, params = [], []
+        for column, value in (('hash', news_hash), ('date', date), ('source', source), ('status', status)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self.conn.execute(
+            f"SELECT segment, member_offset, line FROM records {where} ORDER BY segment, member_offset, line", params
+        )
+        wanted = {}
+        for segment, member_offset, line in rows:
+            wanted.setdefault((segment, member_offset), set()).add(line)
+
+        records = []
+        for (segment, member_offset), lines in wanted.items():
+            with open(self.segment_path(segment), 'rb') as f:
+                f.seek(member_offset)
+                # GzipFile читав би й наступні члени - зупиняємось на останньому потрібному рядку
+                with gzip.GzipFile(fileobj=f) as member:
+                    for number, text in enumerate(member):
+                        if number in lines:
+                            records.append(json.loads(text))
+                        if number >= max(lines):
+                            break
+        return records
+
+    def stats(self):
+        total, segments = self.conn.execute("SELECT COUNT(*), COUNT(DISTINCT segment) FROM records").fetchone()
+        by_status = dict(self.conn.execute("SELECT status, COUNT(*) FROM records GROUP BY status"))
+        return {'records': total, 'segments': segments, 'by_status': by_status}
+
+    def close(self):
+        self.conn.close()
+
+
+def export_markdown(records, out_dir):
+    """Експорт у news_*.md; хеш у назві - записи однієї хвилини не перезаписують один одного"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for record in records:
+        archived_at = datetime.fromisoformat(record['archived_at'])
+        filename = f"news_{archived_at.strftime('%Y-%m-%d_%H-%M')}_{record.get('hash', '')[:8]}.md"
+        path = os.path.join(out_dir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render_markdown(record))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI News archive: lookup and markdown export')
+    parser.add_argument('--dir', default='./data/archive', help='archive directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('stats', help='number of records and segments')
+    export = commands.add_parser('export', help='export records as news_*.md files')
+    export.add_argument('--hash', dest='news_hash')
+    export.add_argument('--date', help='YYYY-MM-DD')
+    export.add_argument('--source')
+    export.add_argument('--status', help='sent, failed or saved')
+    export.add_argument('--out', default='./data/export', help='output directory')
+    args = parser.parse_args()
+
+    archive = NewsArchive({'dir': args.dir})
+    try:
+        if args.command == 'stats':
+            print(json.dumps(archive.stats(), indent=2))
+        else:
+            records = archive.find(args.news_hash, args.date, args.source, args.status)
+            paths = export_markdown(records, args.out)
+            print(f"Exported {len(paths)} news to {args.out}")
+    finally:
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
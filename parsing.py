@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import logging
+import functools
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlparse
+
+import lxml.html
+from lxml import etree
+
+# Функції цього модуля виконуються в пулі процесів, тому всі вони
+# верхньорівневі та працюють лише з простими даними (bytes/str/dict).
+# feedparser та bs4 імпортуються в місці використання: потоковий розбір фідів
+# обходиться lxml, і запуск без HTML-джерел їх не завантажує.
+
+ARTICLE_CLASS = re.compile(r'post|article|entry|blog')
+TITLE_CLASS = re.compile(r'title|heading')
+CONTENT_CLASS = re.compile(r'excerpt|summary|content')
+
+FEED_MARKERS = (b'<rss', b'<feed', b'<rdf:rdf')
+
+MAX_AGE = timedelta(days=7)
+
+
+@functools.lru_cache(maxsize=None)
+def article_strainer():
+    """Будуємо дерево лише для кандидатів у статті, а не для всієї сторінки"""
+    from bs4 import SoupStrainer
+    return SoupStrainer(['article', 'div'], class_=ARTICLE_CLASS)
+
+
+def looks_like_feed(content):
+    """Швидка перевірка початку документа замість повного розбору feedparser'ом"""
+    if isinstance(content, str):
+        content = content.encode('utf-8', 'ignore')
+    head = content[:2048].lower()
+    return any(marker in head for marker in FEED_MARKERS)
+
+
+def html_to_text(html):
+    """Текст з HTML-фрагмента (опис запису фіду)"""
+    if not html or not html.strip():
+        return ''
+    try:
+        return lxml.html.fragment_fromstring(html, create_parent='div').text_content()
+    except Exception:
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, 'lxml').get_text()
+
+
+def parse_feed_entries(content, url, limit=5):
+    """Свіжі (не старші 7 днів) записи фіду у форматі новин"""
+    import feedparser
+    news_items = []
+    feed = feedparser.parse(content)
+    for entry in feed.entries[:limit]:
+        if getattr(entry, 'published_parsed', None):
+            pub_date = datetime(*entry.published_parsed[:6])
+            if datetime.now() - pub_date > MAX_AGE:
+                continue
+        news_items.append({
+            'title': entry.title,
+            'content': html_to_text(entry.get('summary', ''))[:500],
+            'url': entry.link,
+            'source': urlparse(url).netloc,
+            'published': getattr(entry, 'published', 'Unknown')
+        })
+    return news_items
+
+
+def parse_html_articles(content, url, strict=False, limit=5):
+    """Статті з HTML-сторінки; strict - шукати заголовок і опис лише за типовими класами"""
+    from bs4 import BeautifulSoup
+    news_items = []
+    soup = BeautifulSoup(content, 'lxml', parse_only=article_strainer())
+    articles = soup.find_all(['article', 'div'], class_=ARTICLE_CLASS)
+    for article in articles[:limit]:
+        if strict:
+            title_elem = article.find(['h1', 'h2', 'h3'], class_=TITLE_CLASS)
+        else:
+            title_elem = article.find(['h1', 'h2', 'h3'])
+        link_elem = article.find('a', href=True)
+        if title_elem and link_elem:
+            title = title_elem.get_text().strip()
+            if strict:
+                content_elem = article.find(['p', 'div'], class_=CONTENT_CLASS)
+            else:
+                content_elem = article.find(['p', 'div'])
+            news_items.append({
+                'title': title,
+                'content': content_elem.get_text().strip()[:500] if content_elem else title,
+                'url': urljoin(url, link_elem['href']),
+                'source': urlparse(url).netloc,
+                'published': 'Recent'
+            })
+    return news_items
+
+
+def parse_blog_content(content, url, strict=False):
+    """Фід або HTML-сторінка блогу -> список новин"""
+    try:
+        if looks_like_feed(content):
+            return parse_feed_entries(content, url)
+        return parse_html_articles(content, url, strict)
+    except Exception as e:
+        logging.error(f"Parse error {url}: {e}")
+        return []
+
+
+def parse_feed_date(text):
+    """Дата запису фіду (RFC 822 для RSS, ISO 8601 для Atom) у UTC або None"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class StreamingFeedParser:
+    """Інкрементальний розбір RSS/Atom по шматках відповіді
+
+    feed() повертає True, коли далі читати не потрібно: набрано limit свіжих
+    записів або трапився запис, старший за MAX_AGE чи позначку since (фіди
+    впорядковані від нових). Записи з known_ids пропускаються; записи з часом,
+    рівним since, читаються - фіди з датою без часу дають однаковий час.
+    limit_reached - читання зупинилось на limit, і нижче можуть лишатись
+    непрочитані записи.
+    """
+
+    FEED_ROOTS = ('rss', 'feed', 'RDF')
+    ENTRY_TAGS = ('item', 'entry')
+
+    def __init__(self, url, limit=5, max_age=MAX_AGE, since=None, known_ids=()):
+        self.url = url
+        self.limit = limit
+        self.max_age = max_age
+        self.since = since
+        self.known_ids = known_ids
+        self.parser = etree.XMLPullParser(events=('start', 'end'), recover=True, resolve_entities=False)
+        self.root_tag = None
+        self.entries_seen = 0
+        self.news_items = []
+        self.done = False
+        self.limit_reached = False
+
+    @property
+    def is_feed(self):
+        return self.root_tag in self.FEED_ROOTS
+
+    def feed(self, chunk):
+        if self.done:
+            return True
+        self.parser.feed(chunk)
+        for event, elem in self.parser.read_events():
+            tag = etree.QName(elem).localname if isinstance(elem.tag, str) else None
+            if event == 'start':
+                if self.root_tag is None:
+                    self.root_tag = tag
+                continue
+            if tag in self.ENTRY_TAGS:
+                self.entries_seen += 1
+                self._handle_entry(elem)
+                # Звільняємо пам'ять під вже оброблені записи
+                elem.clear()
+                if self.done:
+                    break
+        return self.done
+
+    def close(self):
+        if not self.done:
+            try:
+                self.parser.close()
+            except etree.XMLSyntaxError:
+                pass
+        return self.news_items
+
+    def _handle_entry(self, elem):
+        fields = {}
+        link = None
+        for child in elem:
+            if not isinstance(child.tag, str):
+                continue
+            name = etree.QName(child).localname
+            if name == 'link':
+                # Atom: <link rel="alternate" href="..."/>, RSS: <link>...</link>
+                href = child.get('href')
+                if href and child.get('rel', 'alternate') == 'alternate':
+                    link = link or href
+                elif child.text and child.text.strip():
+                    link = link or child.text.strip()
+            elif name not in fields:
+                fields[name] = child.text or ''
+
+        published = fields.get('pubDate') or fields.get('published') or fields.get('updated') or fields.get('date')
+        published_at = parse_feed_date(published)
+        if published_at and datetime.now(timezone.utc) - published_at > self.max_age:
+            self.done = True
+            return
+        if published_at and self.since and published_at < self.since:
+            # Далі лише вже оброблені записи
+            self.done = True
+            return
+
+        title = (fields.get('title') or '').strip()
+        if not title or not link:
+            return
+        link = urljoin(self.url, link)
+        guid = (fields.get('guid') or fields.get('id') or '').strip() or link
+        if guid in self.known_ids:
+            return
+        summary = fields.get('description') or fields.get('summary') or fields.get('encoded') or fields.get('content', '')
+        self.news_items.append({
+            'title': title,
+            'content': html_to_text(summary).strip()[:500],
+            'url': link,
+            'source': urlparse(self.url).netloc,
+            'published': published.strip() if published else 'Unknown',
+            'entry_id': guid
+        })
+        if len(self.news_items) >= self.limit:
+            self.done = True
+            self.limit_reached = True
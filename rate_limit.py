@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import asyncio
+import contextlib
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Token bucket: rate токенів за секунду, не більше capacity про запас
+
+    Токен резервується одразу (баланс може стати від'ємним), тож замок не
+    потрібен і об'єкт можна використовувати в різних циклах подій.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+
+    def block(self, seconds):
+        """Сервер попросив почекати (наприклад, retry_after) - не видаємо токенів до того часу"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def reserve(self):
+        """Резервуємо токен, повертаємо скільки секунд треба почекати"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        return max(wait, self.blocked_until - now)
+
+    async def acquire(self):
+        """Чекаємо рівно стільки, скільки потрібно для наступного токена"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ConcurrencyLimit:
+    """Скільки запитів одночасно: загалом і на хост (per_host=None - без обмеження)
+
+    Не залежить від сесії: ліміти пулу з'єднань спільної сесії демона загальні
+    для всіх етапів, а цей - лише для свого виклику.
+    """
+
+    def __init__(self, limit, per_host=None):
+        self.total = asyncio.Semaphore(limit)
+        self.per_host = per_host
+        self.hosts = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url):
+        # Спершу місце для хоста: чекаючи на зайнятий хост, не тримаємо загального місця
+        host = urlparse(url).netloc
+        if self.per_host and host not in self.hosts:
+            self.hosts[host] = asyncio.Semaphore(self.per_host)
+        async with self.hosts.get(host) or contextlib.nullcontext():
+            async with self.total:
+                yield
+
+
+class HostRateLimiter:
+    """Окремий token bucket для кожного хоста"""
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.default_rate = settings.get('default_per_second', 5)
+        self.host_rates = settings.get('hosts', {})
+        self.buckets = {}
+
+    async def acquire(self, url):
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.host_rates.get(host, self.default_rate))
+        await self.buckets[host].acquire()
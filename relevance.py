@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import math
+import heapq
+import logging
+from datetime import datetime, timezone
+
+from parsing import parse_feed_date
+
+
+def keyword_pattern(keywords):
+    """Одне регулярне слово-чергування для всіх ключових слів: текст проглядається
+    один раз замість окремого пошуку кожного слова"""
+    ordered = sorted({keyword.lower() for keyword in keywords}, key=len, reverse=True)
+    if not ordered:
+        return None
+    return re.compile('|'.join(re.escape(keyword) for keyword in ordered))
+
+
+class RelevanceScorer:
+    """Оцінка релевантності новини
+
+    score = вага джерела * (keywords * ключові слова + recency * свіжість
+                            + corroboration * підтвердження іншими джерелами)
+
+    Ключові слова - сума ваг різних знайдених слів (у заголовку з множником
+    title_boost); свіжість - експоненційне згасання з півперіодом
+    recency_half_life_hours; підтвердження - log2 кількості джерел кластера
+    майже-дублікатів.
+    """
+
+    def __init__(self, settings=None, keywords=()):
+        settings = settings or {}
+        weights = {keyword.lower(): 1.0 for keyword in keywords}
+        weights.update({keyword.lower(): weight for keyword, weight in settings.get('keyword_weights', {}).items()})
+        self.keyword_weights = weights
+        self.pattern = keyword_pattern(weights)
+        self.title_boost = settings.get('title_boost', 2.0)
+        self.half_life = settings.get('recency_half_life_hours', 24) * 3600
+        # Сторінки без дати (HTML) - посередині між свіжою та застарілою новиною
+        self.undated_recency = settings.get('undated_recency', 0.5)
+        self.source_weights = settings.get('source_weights', {})
+        self.weights = {
+            'keywords': settings.get('keywords_weight', 1.0),
+            'recency': settings.get('recency_weight', 2.0),
+            'corroboration': settings.get('corroboration_weight', 1.5)
+        }
+        self.candidates = settings.get('candidates', 5)
+        self.select = settings.get('select', 3)
+
+    def keyword_score(self, news):
+        if self.pattern is None:
+            return 0.0
+        title_hits = set(self.pattern.findall(news['title'].lower()))
+        body_hits = set(self.pattern.findall(news['content'].lower())) - title_hits
+        return (sum(self.keyword_weights[hit] for hit in title_hits) * self.title_boost
+                + sum(self.keyword_weights[hit] for hit in body_hits))
+
+    def recency_score(self, news, now):
+        published_at = parse_feed_date(news.get('published'))
+        if published_at is None:
+            return self.undated_recency
+        age = max(0.0, (now - published_at).total_seconds())
+        return 0.5 ** (age / self.half_life)
+
+    def source_weight(self, news):
+        for key in (news.get('source_url'), news.get('source')):
+            if key in self.source_weights:
+                return self.source_weights[key]
+        return self.source_weights.get('default', 1.0)
+
+    def corroboration_score(self, news):
+        sources = news.get('cluster_sources') or [news.get('source')]
+        return math.log2(len(sources)) if len(sources) > 1 else 0.0
+
+    def score(self, news, now=None):
+        """Оцінка та її складові; записуються в news['score'] і news['score_parts']"""
+        now = now or datetime.now(timezone.utc)
+        parts = {
+            'keywords': self.keyword_score(news),
+            'recency': self.recency_score(news, now),
+            'corroboration': self.corroboration_score(news)
+        }
+        weight = self.source_weight(news)
+        news['score'] = round(weight * sum(self.weights[name] * value for name, value in parts.items()), 4)
+        news['score_parts'] = dict({name: round(value, 3) for name, value in parts.items()}, source=weight)
+        return news['score']
+
+    def top(self, news_list, k=None):
+        """k найкращих за оцінкою (купа, O(n log k)), від кращої до гіршої"""
+        now = datetime.now(timezone.utc)
+        for news in news_list:
+            self.score(news, now)
+        return heapq.nlargest(k or self.candidates, news_list, key=lambda news: news['score'])
+
+    def log_scores(self, selected, rest):
+        for news in selected:
+            logging.info(f"Score {news['score']:.2f} {news['score_parts']}: {news['title'][:60]}")
+        for news in rest:
+            logging.debug(f"Score {news['score']:.2f} (deferred) {news['score_parts']}: {news['title'][:60]}")
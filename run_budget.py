@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import asyncio
+import logging
+
+# Етапи запуску по порядку; резерв кожного наступного етапу віднімається від дедлайну попередніх
+STAGES = ['fetch', 'validate', 'translate', 'send', 'persist']
+
+DEFAULT_RESERVES = {'validate': 45, 'translate': 90, 'send': 90, 'persist': 30}
+
+
+class RunBudget:
+    """Бюджет часу запуску
+
+    Дедлайн запуску - deadline_minutes від старту циклу (із запасом до
+    timeout-minutes воркфлоу). Кожен етап має власну межу: дедлайн мінус
+    резерви наступних етапів, тож повільне завантаження не з'їсть час
+    перекладу, відправки та збереження стану. Якщо етап закінчився раніше,
+    його залишок дістається наступним.
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.enabled = settings.get('enabled', True)
+        self.started = time.monotonic()
+        self.deadline = self.started + settings.get('deadline_minutes', 10) * 60
+        self.reserves = dict(DEFAULT_RESERVES, **settings.get('reserve_seconds', {}))
+        # За стільки секунд до межі етапу починаємо скасовувати найменш цінні задачі
+        self.cancel_grace = settings.get('cancel_grace_seconds', 20)
+        self.cut_short = []
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def stage_deadline(self, stage):
+        later = STAGES[STAGES.index(stage) + 1:]
+        return self.deadline - sum(self.reserves.get(name, 0) for name in later)
+
+    def time_left(self, stage):
+        """Секунди до межі етапу; None - бюджет вимкнено"""
+        if not self.enabled:
+            return None
+        return max(0.0, self.stage_deadline(stage) - time.monotonic())
+
+    def cut(self, stage, detail=''):
+        logging.warning(f"Run budget: {stage} cut short at its deadline {detail}".rstrip())
+        self.cut_short.append(stage)
+
+    async def wait_for(self, stage, awaitable):
+        """Чекаємо в межах етапу; після межі - asyncio.TimeoutError"""
+        try:
+            return await asyncio.wait_for(awaitable, self.time_left(stage))
+        except asyncio.TimeoutError:
+            self.cut(stage)
+            raise
+
+    async def gather_prioritized(self, stage, jobs):
+        """Виконуємо [(priority, coroutine), ...] паралельно, запускаючи цінніші першими
+
+        За cancel_grace до межі етапу незавершені задачі скасовуються по одній, від
+        найменш цінної: найцінніші отримують весь залишок часу. Результати - у
+        порядку jobs, скасовані задачі дають asyncio.CancelledError.
+        """
+        order = sorted(range(len(jobs)), key=lambda index: jobs[index][0], reverse=True)
+        tasks = {index: asyncio.create_task(jobs[index][1]) for index in order}
+        left = self.time_left(stage)
+        if tasks and left is not None:
+            grace = min(self.cancel_grace, left)
+            _, pending = await asyncio.wait(tasks.values(), timeout=left - grace)
+            if pending:
+                self.cut(stage, f"- cancelling {len(pending)} of {len(tasks)} tasks, least valuable first")
+                queue = [tasks[index] for index in reversed(order) if tasks[index] in pending]
+                # Кожна наступна задача живе на grace / len(queue) довше; найцінніша - до межі етапу
+                start = time.monotonic()
+                for position, task in enumerate(queue, 1):
+                    cancel_at = start + grace * position / len(queue)
+                    await asyncio.wait([task], timeout=max(0.0, cancel_at - time.monotonic()))
+                    task.cancel()
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        by_index = dict(zip(tasks.keys(), results))
+        return [by_index[index] for index in range(len(jobs))]
+
+    def log_summary(self):
+        used = time.monotonic() - self.started
+        cut = f", cut short: {', '.join(self.cut_short)}" if self.cut_short else ''
+        logging.info(f"Run budget: {used:.1f}s used, {self.remaining():.1f}s left{cut}")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+import logging
+from contextlib import contextmanager
+
+METRIC_PREFIX = 'ai_news'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RunMetrics:
+    """Метрики одного запуску: час і кількість елементів по етапах, джерела, кеші
+
+    Після запуску пишуться в ./logs: рядок у metrics.jsonl (історія запусків)
+    та ai_news.prom для node_exporter textfile collector.
+    """
+
+    def __init__(self, settings=None, metrics_dir='./logs'):
+        settings = settings or {}
+        self.metrics_dir = settings.get('dir', metrics_dir)
+        self.max_runs = settings.get('max_runs', 500)
+        self.started_at = time.time()
+        self.stages = {}
+        self.sources = {}
+        self.caches = {}
+        self.counters = {}
+
+    def _stage(self, name):
+        return self.stages.setdefault(name, {'seconds': 0.0, 'items': 0})
+
+    @contextmanager
+    def stage(self, name):
+        """Вимірюємо етап; кількість елементів можна записати в entry['items']"""
+        entry = self._stage(name)
+        started = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] += time.perf_counter() - started
+
+    def add_time(self, name, seconds, items=0):
+        """Накопичуємо час етапу, який виконується частинами (наприклад, розбір по шматках)"""
+        entry = self._stage(name)
+        entry['seconds'] += seconds
+        entry['items'] += items
+
+    def timed(self, name, func):
+        """Обгортка, що додає час кожного виклику func до етапу name"""
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - started)
+        return wrapper
+
+    def source(self, url, **values):
+        """Дані по джерелу: seconds, items, bytes, status, timeout, error_streak"""
+        self.sources.setdefault(url, {}).update(values)
+
+    def cache(self, name, hits, misses):
+        self.caches[name] = {'hits': hits, 'misses': misses}
+
+    def count(self, name, value):
+        self.counters[name] = value
+
+    def to_dict(self):
+        caches = {}
+        for name, cache in self.caches.items():
+            total = cache['hits'] + cache['misses']
+            caches[name] = dict(cache, hit_rate=round(cache['hits'] / total, 4) if total else None)
+        return {
+            'started_at': self.started_at,
+            'duration': round(time.time() - self.started_at, 4),
+            'stages': {name: {'seconds': round(stage['seconds'], 4), 'items': stage['items']}
+                       for name, stage in self.stages.items()},
+            'sources': self.sources,
+            'caches': caches,
+            'counters': self.counters
+        }
+
+    def prometheus(self, data):
+        """Текстовий формат Prometheus"""
+        lines = []
+
+        def metric(name, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{escape_label(val)}"' for key, val in labels.items())
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}" if label_text
+                             else f"{METRIC_PREFIX}_{name} {value}")
+
+        metric('run_timestamp_seconds', 'Start time of the last run', [({}, data['started_at'])])
+        metric('run_duration_seconds', 'Wall time of the last run', [({}, data['duration'])])
+        metric('stage_seconds', 'Wall time per stage',
+               [({'stage': name}, stage['seconds']) for name, stage in data['stages'].items()])
+        metric('stage_items', 'Items handled per stage',
+               [({'stage': name}, stage['items']) for name, stage in data['stages'].items()])
+        for field in ('seconds', 'items', 'bytes', 'timeout', 'error_streak'):
+            metric(f"source_{field}", f"Per-source {field}",
+                   [({'source': url}, values[field]) for url, values in data['sources'].items() if field in values])
+        metric('cache_hit_ratio', 'Cache hit ratio',
+               [({'cache': name}, cache['hit_rate']) for name, cache in data['caches'].items()
+                if cache['hit_rate'] is not None])
+        for name, value in data['counters'].items():
+            metric(name, name.replace('_', ' ').capitalize(), [({}, value)])
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        """Дописуємо запуск у metrics.jsonl та оновлюємо ai_news.prom"""
+        data = self.to_dict()
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        history_file = os.path.join(self.metrics_dir, 'metrics.jsonl')
+        history = []
+        if os.path.exists(history_file):
+            with open(history_file, 'r', encoding='utf-8') as f:
+                history = f.readlines()[-(self.max_runs - 1):] if self.max_runs > 1 else []
+        history.append(json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n')
+        tmp_file = f"{history_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.writelines(history)
+        os.replace(tmp_file, history_file)
+
+        prom_file = os.path.join(self.metrics_dir, f"{METRIC_PREFIX}.prom")
+        tmp_file = f"{prom_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus(data))
+        os.replace(tmp_file, prom_file)
+
+        summary = ', '.join(f"{name} {stage['seconds']:.2f}s" for name, stage in data['stages'].items())
+        logging.info(f"Run metrics: {data['duration']:.2f}s total ({summary})")
+        return data
@@ -16,6 +16,7 @@ def main():
     
     # Налаштування логування
     log_file = f'./logs/ai_news_{datetime.now().strftime("%Y%m%d")}.log'
+    os.makedirs('./logs', exist_ok=True)
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s',
@@ -3,14 +3,20 @@
 
 import schedule
 import time
+import signal
+import asyncio
+import logging
+import argparse
 from datetime import datetime, timedelta
-from ai_news_monitor import AINewsMonitor
+from ai_news_monitor import AINewsMonitor, setup_logging, worker_log_file
 
 class AdaptiveScheduler:
-    def __init__(self):
-        self.monitor = AINewsMonitor()
+    def __init__(self, worker=None, workers=None):
+        self.monitor = AINewsMonitor(worker, workers)
         self.peak_hours = [(9, 12), (14, 18)]  # UTC: 9-12, 14-18
         self.weekend_modifier = 0.5  # Менше активності на вихідних
+        self.stop_requested = None
+        self.current_cycle = None
         
     def get_current_priority(self):
         """Визначає пріоритет моніторингу залежно від часу"""
@@ -52,18 +58,28 @@ class AdaptiveScheduler:
         
         return adaptive_interval
     
+    def get_daemon_delay(self):
+        """Секунди до наступного циклу демона: до найближчого джерела за розкладом
+        (без розкладу джерел - адаптивний інтервал за часом доби)"""
+        if not self.monitor.source_schedule.enabled:
+            return self.get_adaptive_interval() * 60
+        return max(60, self.monitor.seconds_until_next_poll())
+    
     def run_monitor_adaptive(self):
         """Запуск моніторингу з логуванням пріоритету"""
         priority = self.get_current_priority()
-        next_interval = self.get_adaptive_interval()
         
-        print(f"Запуск моніторингу (пріоритет: {priority:.1f}, наступний запуск через {next_interval} хв)")
+        print(f"Запуск моніторингу (пріоритет: {priority:.1f})")
         
         try:
             self.monitor.run_once()
         except Exception as e:
             print(f"Помилка: {e}")
         
+        # Наступний запуск - коли настане час найближчого джерела
+        next_interval = max(1, int(self.get_daemon_delay() // 60))
+        print(f"Наступний запуск через {next_interval} хв")
+        
         # Очищаємо старий розклад та встановлюємо новий
         schedule.clear('adaptive')
         schedule.every(next_interval).minutes.do(self.run_monitor_adaptive).tag('adaptive')
@@ -93,9 +109,67 @@ class AdaptiveScheduler:
             schedule.run_pending()
             time.sleep(60)  # Перевіряємо кожну хвилину
 
+    def request_stop(self):
+        """Перший сигнал - зупинка після поточного циклу, другий - перериваємо цикл"""
+        if self.stop_requested.is_set() and self.current_cycle is not None:
+            logging.warning("Second stop signal - cancelling the current cycle")
+            self.current_cycle.cancel()
+            return
+        logging.info("Stop requested - finishing the current cycle")
+        self.stop_requested.set()
+    
+    async def run_daemon(self):
+        """Демон: один цикл подій, сесія з keep-alive та кешем DNS, пул процесів і
+        стан у пам'яті живуть між циклами; при зупинці стан записується на диск"""
+        self.stop_requested = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows: обробники сигналів у циклі подій недоступні
+                pass
+        
+        logging.info("Starting AI News daemon")
+        await self.monitor.open_daemon_resources()
+        try:
+            while not self.stop_requested.is_set():
+                logging.info("Daemon cycle")
+                self.current_cycle = asyncio.create_task(self.monitor.run_once_async())
+                try:
+                    await self.current_cycle
+                except asyncio.CancelledError:
+                    logging.warning("Daemon cycle cancelled")
+                except Exception as e:
+                    logging.error(f"Daemon cycle error: {e}")
+                finally:
+                    self.current_cycle = None
+                delay = self.get_daemon_delay()
+                logging.info(f"Next daemon cycle in {delay / 60:.0f} min")
+                try:
+                    await asyncio.wait_for(self.stop_requested.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.monitor.close_daemon_resources()
+            logging.info("AI News daemon stopped")
+    
+    def start_daemon(self):
+        asyncio.run(self.run_daemon())
+
 def main():
-    scheduler = AdaptiveScheduler()
-    scheduler.start_adaptive_scheduling()
+    parser = argparse.ArgumentParser(description='AI News adaptive scheduler')
+    parser.add_argument('--daemon', action='store_true',
+                        help='run as a long-lived async daemon with persistent connections and state')
+    parser.add_argument('--workers', type=int, help='total number of workers sharing the sources')
+    parser.add_argument('--worker', type=int, default=0, help='index of this worker (with --workers)')
+    args = parser.parse_args()
+    setup_logging(worker_log_file(args.worker, args.workers))
+    scheduler = AdaptiveScheduler(args.worker, args.workers)
+    if args.daemon:
+        scheduler.start_daemon()
+    else:
+        scheduler.start_adaptive_scheduling()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+import sqlite3
+import logging
+
+
+class SentNewsStore:
+    """Сховище хешів надісланих новин (SQLite): O(1) пошук, дозапис, TTL від першої появи
+
+    Експорт у sent_news.json - компактний словник {hash: first_seen}, який
+    завантажується як артефакт GitHub Actions. Якщо бази ще немає, її
+    одноразово заповнюємо з цього файлу (підтримується і старий формат - список).
+
+    Кілька процесів (воркери, запуски, що перекрились) працюють з базою
+    одночасно: WAL, очікування блокування, а перед відправкою новина
+    атомарно резервується (claim), тож двічі її не надішле ніхто.
+    """
+
+    def __init__(self, db_file='./data/sent_news.db', export_file='./data/sent_news.json', ttl_days=90,
+                 claim_ttl_minutes=30):
+        self.db_file = db_file
+        self.export_file = export_file
+        self.ttl = ttl_days * 86400
+        self.claim_ttl = claim_ttl_minutes * 60
+        is_new = not os.path.exists(db_file)
+        self.conn = sqlite3.connect(db_file, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sent_news (hash TEXT PRIMARY KEY, first_seen REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS claims (hash TEXT PRIMARY KEY, owner TEXT NOT NULL, claimed_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+        if is_new:
+            self.migrate()
+
+    def migrate(self):
+        """Одноразове перенесення хешів з JSON-файлу"""
+        if not os.path.exists(self.export_file):
+            logging.info("No sent news found - starting with empty store")
+            return
+        try:
+            with open(self.export_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.export_file}: {e}")
+            return
+        if isinstance(data, list):
+            # Старий формат не знає часу відправки - рахуємо від моменту міграції
+            now = time.time()
+            rows = [(news_hash, now) for news_hash in data]
+        else:
+            rows = list(data.items())
+        self.conn.executemany("INSERT OR IGNORE INTO sent_news VALUES (?, ?)", rows)
+        self.conn.commit()
+        logging.info(f"Migrated {len(rows)} sent news hashes from {self.export_file}")
+
+    def __contains__(self, news_hash):
+        row = self.conn.execute("SELECT 1 FROM sent_news WHERE hash = ?", (news_hash,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM sent_news").fetchone()[0]
+
+    def add(self, news_hash):
+        """Записуємо хеш одразу - відправлена новина не загубиться при збої"""
+        self.conn.execute("INSERT OR IGNORE INTO sent_news VALUES (?, ?)", (news_hash, time.time()))
+        self.conn.execute("DELETE FROM claims WHERE hash = ?", (news_hash,))
+        self.conn.commit()
+
+    def claim(self, hashes, owner):
+        """Атомарно резервуємо новину (усі її хеші) за owner
+
+        False - новину вже надіслано або її тримає інший процес; резерв
+        процесу, що впав, вважається вільним через claim_ttl.
+        """
+        placeholders = ','.join('?' * len(hashes))
+        now = time.time()
+        # IMMEDIATE - блокування на запис з першого запиту: перевірка і резерв неподільні
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            taken = self.conn.execute(
+                f"SELECT 1 FROM sent_news WHERE hash IN ({placeholders}) UNION ALL "
+                f"SELECT 1 FROM claims WHERE hash IN ({placeholders}) AND owner != ? AND claimed_at > ?",
+                [*hashes, *hashes, owner, now - self.claim_ttl]
+            ).fetchone()
+            if taken:
+                self.conn.rollback()
+                return False
+            self.conn.executemany("INSERT OR REPLACE INTO claims VALUES (?, ?, ?)",
+                                  [(news_hash, owner, now) for news_hash in hashes])
+            self.conn.commit()
+            return True
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def release(self, hashes, owner):
+        """Знімаємо резерв (відправка не вдалась - новину можна спробувати знову)"""
+        self.conn.executemany("DELETE FROM claims WHERE hash = ? AND owner = ?",
+                              [(news_hash, owner) for news_hash in hashes])
+        self.conn.commit()
+
+    def evict(self):
+        """Видаляємо записи, старші за TTL, та прострочені резерви"""
+        cursor = self.conn.execute("DELETE FROM sent_news WHERE first_seen < ?", (time.time() - self.ttl,))
+        self.conn.execute("DELETE FROM claims WHERE claimed_at < ?", (time.time() - self.claim_ttl,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def export(self):
+        """Компактний експорт для артефакту"""
+        data = dict(self.conn.execute("SELECT hash, first_seen FROM sent_news"))
+        # Тимчасовий файл свій для кожного процесу - кілька воркерів експортують одночасно
+        tmp_file = f"{self.export_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_file, self.export_file)
+
+    def close(self):
+        self.conn.close()
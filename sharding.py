@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import bisect
+import hashlib
+import sqlite3
+
+
+def ring_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def worker_name(index):
+    return f"worker-{index}"
+
+
+class HashRing:
+    """Консистентне хешування: кожен вузол має replicas віртуальних точок на колі,
+    ключ належить першій точці за ним. Зміна кількості вузлів переносить лише
+    частку ключів, а не перемішує всі."""
+
+    def __init__(self, nodes, replicas=100):
+        self.points = sorted((ring_hash(f"{node}#{replica}"), node) for node in nodes for replica in range(replicas))
+        self.hashes = [point for point, _ in self.points]
+
+    def node_for(self, key):
+        if not self.points:
+            return None
+        position = bisect.bisect(self.hashes, ring_hash(key)) % len(self.points)
+        return self.points[position][1]
+
+
+class Shard:
+    """Частка джерел одного воркера з count"""
+
+    def __init__(self, index=0, count=1, replicas=100):
+        if not 0 <= index < count:
+            raise ValueError(f"Worker index {index} is out of range for {count} workers")
+        self.index = index
+        self.count = count
+        self.name = worker_name(index)
+        self.ring = HashRing([worker_name(i) for i in range(count)], replicas)
+
+    @property
+    def enabled(self):
+        return self.count > 1
+
+    def owns(self, key):
+        return not self.enabled or self.ring.node_for(key) == self.name
+
+
+class SourceStateStore:
+    """Стан джерел (розклад, позначки) у спільній SQLite-базі з WAL
+
+    Кожен воркер записує лише рядки своїх джерел, тож одночасне збереження
+    не затирає чужий стан, як це було б з одним JSON-файлом.
+    """
+
+    def __init__(self, db_file):
+        self.conn = sqlite3.connect(db_file, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS source_state (namespace TEXT NOT NULL, source TEXT NOT NULL, "
+            "value TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (namespace, source))"
+        )
+        self.conn.commit()
+
+    def load(self, namespace):
+        rows = self.conn.execute("SELECT source, value FROM source_state WHERE namespace = ?", (namespace,))
+        return {source: json.loads(value) for source, value in rows}
+
+    def save(self, namespace, entries):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO source_state VALUES (?, ?, ?, ?)",
+            [(namespace, source, json.dumps(value, separators=(',', ':')), now) for source, value in entries.items()]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+import logging
+from datetime import datetime
+
+# Статуси, за яких джерело відповіло як слід (304 - без змін)
+HEALTHY_STATUSES = (200, 304)
+
+
+def percentile(values, q):
+    """Перцентиль без інтерполяції - для кількох десятків замірів цього досить"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class SourceHealth:
+    """Здоров'я джерел і автоматичний вимикач (circuit breaker)
+
+    Для кожного джерела зберігаються останні затримки, серія помилок, час
+    останнього успіху та скільки записів дає розбір. Після failure_threshold
+    помилок поспіль вимикач розмикається: джерело пропускається на
+    base_backoff * 2^(серія - поріг), не довше max_backoff. Коли час минає,
+    джерело опитується знову (пробний запит): успіх замикає вимикач, помилка
+    подовжує паузу. Тайм-аут запиту - p95 затримок джерела з запасом
+    timeout_multiplier у межах [min_timeout, max_timeout].
+    """
+
+    def __init__(self, settings=None, state_file='./data/source_health.json', store=None):
+        settings = settings or {}
+        self.state_file = state_file
+        # Спільна база воркерів (sharding.SourceStateStore), як для розкладу та позначок
+        self.store = store
+        self.dirty = set()
+        self.enabled = settings.get('enabled', True)
+        self.failure_threshold = settings.get('failure_threshold', 3)
+        self.base_backoff = settings.get('base_backoff_minutes', 30) * 60
+        self.max_backoff = settings.get('max_backoff_minutes', 1440) * 60
+        self.window = settings.get('latency_window', 20)
+        self.min_samples = settings.get('min_samples', 3)
+        self.timeout_multiplier = settings.get('timeout_multiplier', 3.0)
+        self.min_timeout = settings.get('min_timeout', 3)
+        self.max_timeout = settings.get('max_timeout', 15)
+        self.sources = self.load()
+
+    def load(self):
+        """Завантажуємо стан джерел"""
+        if self.store:
+            return self.store.load('source_health')
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.state_file}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігаємо стан джерел"""
+        if self.store:
+            self.store.save('source_health', {url: self.sources[url] for url in self.dirty})
+            self.dirty.clear()
+            return
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.sources, f, separators=(',', ':'))
+        os.replace(tmp_file, self.state_file)
+
+    def entry(self, url):
+        self.dirty.add(url)
+        return self.sources.setdefault(url, {
+            'latencies': [], 'yields': [], 'error_streak': 0, 'successes': 0, 'failures': 0,
+            'last_success': None, 'last_failure': None, 'last_error': None, 'open_until': None
+        })
+
+    def state(self, url, now=None):
+        """closed - працює; open - пропускаємо; half-open - час пробного запиту"""
+        entry = self.sources.get(url)
+        if not entry or not entry['open_until']:
+            return 'closed'
+        return 'open' if (now or time.time()) < entry['open_until'] else 'half-open'
+
+    def blocked_until(self, url):
+        """Час пробного запиту джерела з розімкнутим вимикачем (None - вимикач замкнутий)"""
+        entry = self.sources.get(url)
+        return entry['open_until'] if self.enabled and entry else None
+
+    def allow(self, url, now=None):
+        return not self.enabled or self.state(url, now) != 'open'
+
+    def timeout(self, url, default=15):
+        """Тайм-аут запиту до джерела за його спостережуваною затримкою"""
+        entry = self.sources.get(url)
+        if not self.enabled or not entry or len(entry['latencies']) < self.min_samples:
+            return default
+        p95 = percentile(entry['latencies'], 0.95)
+        return round(max(self.min_timeout, min(self.max_timeout, p95 * self.timeout_multiplier)), 1)
+
+    def record_success(self, url, seconds, items=None):
+        """items - скільки записів дав розбір (None для 304)"""
+        entry = self.entry(url)
+        if entry['open_until']:
+            logging.info(f"Circuit closed for {url} after {entry['error_streak']} failures")
+        entry['latencies'] = (entry['latencies'] + [round(seconds, 3)])[-self.window:]
+        if items is not None:
+            entry['yields'] = (entry['yields'] + [items])[-self.window:]
+        entry['error_streak'] = 0
+        entry['open_until'] = None
+        entry['successes'] += 1
+        entry['last_success'] = time.time()
+
+    def record_failure(self, url, seconds, error, now=None):
+        """Помилка опитування; після порогу - розмикаємо вимикач з експоненційною паузою"""
+        now = now or time.time()
+        entry = self.entry(url)
+        # Затримку невдалого запиту не вчимо: тайм-аут інакше ріс би від самих тайм-аутів
+        entry['error_streak'] += 1
+        entry['failures'] += 1
+        entry['last_failure'] = now
+        entry['last_error'] = str(error)[:200]
+        overflow = entry['error_streak'] - self.failure_threshold
+        if overflow >= 0:
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** overflow)
+            entry['open_until'] = now + backoff
+            logging.warning(f"Circuit open for {url}: {entry['error_streak']} failures in a row, "
+                            f"next probe in {backoff / 60:.0f} min ({entry['last_error']})")
+
+    def observe(self, url, seconds, status, items):
+        """Результат опитування: статус HTTP (None - запит не вдався) та кількість записів"""
+        if status in HEALTHY_STATUSES:
+            self.record_success(url, seconds, items if status == 200 else None)
+        else:
+            self.record_failure(url, seconds, f"status {status}" if status else 'request failed')
+
+    def available(self, urls, now=None):
+        """Джерела із замкнутим вимикачем або часом пробного запиту"""
+        allowed = [url for url in urls if self.allow(url, now)]
+        for url in urls:
+            if url not in allowed:
+                reopen = datetime.fromtimestamp(self.sources[url]['open_until']).strftime('%H:%M')
+                logging.info(f"Circuit open - skipping {url} until {reopen}")
+        return allowed
+
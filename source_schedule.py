@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+import hashlib
+import logging
+import statistics
+
+from parsing import parse_feed_date
+
+# Успішне опитування (304 - джерело не змінилось з минулого разу)
+OK_STATUSES = (200, 304)
+
+
+def item_key(item):
+    return hashlib.md5(item['url'].encode('utf-8')).hexdigest()[:16]
+
+
+def published_timestamps(items):
+    """Час публікації записів (лише ті, де дату вдалося розібрати), від старих до нових"""
+    timestamps = []
+    for item in items:
+        published_at = parse_feed_date(item.get('published'))
+        if published_at:
+            timestamps.append(published_at.timestamp())
+    return sorted(timestamps)
+
+
+class SourceSchedule:
+    """Окремий розклад опитування для кожного джерела
+
+    Для джерела оцінюється середній проміжок між публікаціями: за датами
+    записів, а де їх немає - за історією змін (скільки нових записів з'явилося
+    з минулої зміни). Інтервал опитування - частка цього проміжку в межах
+    [min_interval, max_interval]. Стан зберігається між запусками.
+    """
+
+    def __init__(self, settings=None, state_file='./data/source_schedule.json', store=None):
+        settings = settings or {}
+        self.state_file = state_file
+        # Спільне сховище воркерів (sharding.SourceStateStore) замість JSON-файлу
+        self.store = store
+        self.dirty = set()
+        self.enabled = settings.get('enabled', True)
+        self.min_interval = settings.get('min_interval_minutes', 15) * 60
+        self.max_interval = settings.get('max_interval_minutes', 1440) * 60
+        self.initial_gap = settings.get('initial_gap_minutes', 240) * 60
+        self.poll_fraction = settings.get('poll_fraction', 0.5)
+        self.smoothing = settings.get('smoothing', 0.3)
+        self.max_seen = settings.get('max_seen', 50)
+        self.sources = self.load()
+
+    def load(self):
+        """Завантажуємо стан джерел"""
+        if self.store:
+            return self.store.load('source_schedule')
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.state_file}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігаємо стан джерел"""
+        if self.store:
+            # Лише змінені джерела - решту могли оновити інші воркери
+            self.store.save('source_schedule', {url: self.sources[url] for url in self.dirty})
+            self.dirty.clear()
+            return
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.sources, f, separators=(',', ':'))
+        os.replace(tmp_file, self.state_file)
+
+    def clamp(self, interval):
+        return max(self.min_interval, min(interval, self.max_interval))
+
+    def is_due(self, url, now=None):
+        """Нове джерело або джерело, час якого настав (розклад вимкнено - завжди)"""
+        if not self.enabled:
+            return True
+        entry = self.sources.get(url)
+        return entry is None or entry['next_due'] <= (now or time.time())
+
+    def due(self, urls, now=None):
+        now = now or time.time()
+        return [url for url in urls if self.is_due(url, now)]
+
+    def seconds_until_due(self, urls, now=None, blocked_until=None):
+        """Скільки чекати до найближчого джерела (для сну демона)
+
+        blocked_until - {url: час}, раніше якого джерело не опитується (розімкнутий вимикач).
+        """
+        now = now or time.time()
+        if not self.enabled:
+            return self.min_interval
+        blocked_until = blocked_until or {}
+        waits = [max(self.sources[url]['next_due'] if url in self.sources else now, blocked_until.get(url) or 0) - now
+                 for url in urls]
+        return max(0, min(waits, default=self.min_interval))
+
+    def observe(self, url, items, status, now=None):
+        """Враховуємо результат опитування та призначаємо наступне
+
+        status - HTTP-статус джерела (304 - без змін); помилку не вчимо,
+        джерело лишається до опитування на наступному запуску.
+        """
+        now = now or time.time()
+        entry = self.sources.setdefault(url, {
+            'gap': self.initial_gap, 'interval': self.clamp(self.initial_gap * self.poll_fraction),
+            'last_change': None, 'next_due': now, 'seen': []
+        })
+        entry['last_polled'] = now
+        self.dirty.add(url)
+        if status not in OK_STATUSES:
+            entry['next_due'] = now + self.min_interval
+            return entry
+
+        keys = [item_key(item) for item in items] if status == 200 else []
+        seen = set(entry['seen'])
+        new_count = sum(1 for key in keys if key not in seen)
+        timestamps = published_timestamps(items) if status == 200 else []
+
+        first = entry['last_change'] is None
+        observed = None
+        gaps = [later - earlier for earlier, later in zip(timestamps, timestamps[1:]) if later > earlier]
+        if gaps:
+            observed = statistics.median(gaps)
+        elif new_count and entry['last_change']:
+            observed = (now - entry['last_change']) / new_count
+        elif not new_count and entry['last_change'] and now - entry['last_change'] > entry['gap']:
+            # Довше тиші, ніж очікували - проміжок між публікаціями щонайменше такий
+            observed = now - entry['last_change']
+
+        if new_count:
+            entry['last_change'] = max(timestamps[-1], entry['last_change'] or 0) if timestamps else now
+        elif entry['last_change'] is None:
+            entry['last_change'] = now
+        if observed and first:
+            # Перше спостереження замінює початкову оцінку, далі - згладжуємо
+            entry['gap'] = observed
+        elif observed:
+            entry['gap'] = self.smoothing * observed + (1 - self.smoothing) * entry['gap']
+        current = set(keys)
+        entry['seen'] = (keys + [key for key in entry['seen'] if key not in current])[:self.max_seen]
+        entry['interval'] = self.clamp(entry['gap'] * self.poll_fraction)
+        entry['next_due'] = now + entry['interval']
+        return entry
+
+    def log_plan(self, total, polled):
+        logging.info(f"Source schedule: polling {polled} of {total} sources")
+        for url, entry in sorted(self.sources.items(), key=lambda pair: pair[1]['next_due']):
+            logging.debug(f"Schedule {url}: every {entry['interval'] / 60:.0f} min, "
+                          f"next in {(entry['next_due'] - time.time()) / 60:.0f} min")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import logging
+from datetime import datetime, timezone
+
+from parsing import parse_feed_date
+
+
+def entry_id(item):
+    """Ідентифікатор запису: GUID/id з фіду або посилання"""
+    return item.get('entry_id') or item['url']
+
+
+def published_at(item):
+    return parse_feed_date(item.get('published'))
+
+
+class SourceWatermarks:
+    """Позначки інкрементального читання для кожного джерела
+
+    Для джерела зберігаються час публікації останнього обробленого запису та
+    ідентифікатори недавно оброблених записів. Читання віддає лише новіші
+    записи; позначка зсувається тільки після обробки (фільтр відхилив запис
+    або його надіслано), тож необроблені записи повертаються наступного разу.
+    Записи з часом, рівним позначці, не відкидаються: вже оброблені з них
+    відсіює known_ids. Якщо читання зупинилось на ліміті записів, позначка
+    не зсувається, доки джерело не дочитане.
+    """
+
+    def __init__(self, settings=None, state_file='./data/watermarks.json', store=None):
+        settings = settings or {}
+        self.state_file = state_file
+        # Якщо задано - позначки в спільній базі воркерів (sharding.SourceStateStore)
+        self.store = store
+        self.dirty = set()
+        # Джерела, читання яких у цьому запуску зупинилось на ліміті записів
+        self.limited = set()
+        self.enabled = settings.get('enabled', True)
+        self.max_ids = settings.get('max_ids', 200)
+        self.sources = self.load()
+
+    def load(self):
+        """Завантажуємо позначки"""
+        if self.store:
+            return self.store.load('watermarks')
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.state_file}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігаємо позначки"""
+        if self.store:
+            # Пишемо тільки оновлені тут позначки, чужих джерел не чіпаємо
+            self.store.save('watermarks', {url: self.sources[url] for url in self.dirty})
+            self.dirty.clear()
+            return
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.sources, f, separators=(',', ':'))
+        os.replace(tmp_file, self.state_file)
+
+    def since(self, source_url):
+        """Час останнього обробленого запису (UTC) або None"""
+        entry = self.sources.get(source_url) if self.enabled else None
+        if not entry or entry['published'] is None:
+            return None
+        return datetime.fromtimestamp(entry['published'], timezone.utc)
+
+    def known_ids(self, source_url):
+        entry = self.sources.get(source_url) if self.enabled else None
+        return frozenset(entry['ids']) if entry else frozenset()
+
+    def new_items(self, source_url, items):
+        """Записи, новіші за позначку джерела; кожен позначаємо джерелом для advance()"""
+        since = self.since(source_url)
+        known = self.known_ids(source_url)
+        fresh = []
+        for item in items:
+            item.setdefault('entry_id', item['url'])
+            item['source_url'] = source_url
+            if entry_id(item) in known:
+                continue
+            published = published_at(item)
+            if since and published and published < since:
+                continue
+            fresh.append(item)
+        if len(fresh) < len(items):
+            logging.info(f"Watermark {source_url}: {len(fresh)} of {len(items)} entries are new")
+        if self.enabled:
+            # Прочитане, але ще не оброблене; advance() уточнить після обробки
+            entry = self.sources.setdefault(source_url, {'published': None, 'ids': []})
+            entry['limited'] = source_url in self.limited
+            entry['pending'] = bool(fresh) or entry['limited']
+            self.limited.discard(source_url)
+            self.dirty.add(source_url)
+        return fresh
+
+    def mark_limited(self, source_url):
+        """Читання зупинилось на ліміті записів: нижче прочитаних можуть бути непрочитані"""
+        self.limited.add(source_url)
+
+    def has_pending(self, source_url):
+        """Чи лишились у джерела необроблені записи: тоді відповідь 304 не означає "нічого нового",
+        і збережене тіло треба розібрати знову (без позначок - завжди)"""
+        entry = self.sources.get(source_url) if self.enabled else None
+        return entry is None or entry.get('pending', True)
+
+    def advance(self, news_list, pending):
+        """Зсуваємо позначки за обробленими записами
+
+        pending - записи, що пройшли фільтри, але не надіслані: позначка не
+        переходить через них, і вони повернуться при наступному читанні.
+        """
+        pending_ids = {id(news) for news in pending}
+        by_source = {}
+        for news in news_list:
+            if 'source_url' in news:
+                done, waiting = by_source.setdefault(news['source_url'], ([], []))
+                (waiting if id(news) in pending_ids else done).append(news)
+
+        for source_url, (done, waiting) in by_source.items():
+            entry = self.sources.setdefault(source_url, {'published': None, 'ids': []})
+            self.dirty.add(source_url)
+            waiting_times = [published.timestamp() for published in map(published_at, waiting) if published]
+            limit = min(waiting_times, default=float('inf'))
+            done_times = [published.timestamp() for published in map(published_at, done) if published]
+            done_times = [timestamp for timestamp in done_times if timestamp < limit]
+            # Недочитане джерело: позначку не зсуваємо, прочитані записи відсіє known_ids
+            if done_times and not entry.get('limited'):
+                entry['published'] = max(entry['published'] or 0, max(done_times))
+            entry['pending'] = bool(waiting) or entry.get('limited', False)
+            ids = [entry_id(news) for news in done]
+            current = set(ids)
+            entry['ids'] = (ids + [known for known in entry['ids'] if known not in current])[:self.max_ids]
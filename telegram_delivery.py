@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import random
+import asyncio
+import logging
+
+import aiohttp
+
+from rate_limit import TokenBucket
+
+TELEGRAM_API_BASE = "https://api.telegram.org"
+
+
+class TelegramDelivery:
+    """Асинхронна доставка в Telegram: спільний пул з'єднань, token bucket на чат, обробка 429"""
+
+    def __init__(self, bot_token, telegram_config, settings=None):
+        rate_limits = telegram_config.get('rate_limits', {})
+        settings = settings or {}
+        self.bot_token = bot_token
+        self.message_settings = telegram_config.get('message_settings', {})
+        self.api_base = settings.get('api_base', TELEGRAM_API_BASE)
+        self.rate = rate_limits.get('messages_per_minute', 20) / 60
+        self.burst = rate_limits.get('burst', 1)
+        self.max_retries = settings.get('max_retries', 3)
+        self.backoff_base = settings.get('backoff_seconds', 1.0)
+        self.timeout = settings.get('timeout', 10)
+        self.client_timeout = aiohttp.ClientTimeout(total=self.timeout)
+        self.buckets = {}
+
+    def bucket(self, chat_id):
+        if chat_id not in self.buckets:
+            self.buckets[chat_id] = TokenBucket(self.rate, self.burst)
+        return self.buckets[chat_id]
+
+    def backoff(self, attempt):
+        return self.backoff_base * 2 ** attempt * random.uniform(0.5, 1.5)
+
+    async def send(self, session, chat_id, text, message_settings=None):
+        """Надсилаємо одне повідомлення з повторами; повертаємо (ok, error)
+
+        message_settings - налаштування цілі розсилки поверх загальних.
+        """
+        url = f"{self.api_base}/bot{self.bot_token}/sendMessage"
+        settings = dict(self.message_settings, **(message_settings or {}))
+        data = {
+            'chat_id': chat_id,
+            'text': text,
+            'parse_mode': settings.get('parse_mode', 'Markdown'),
+            'disable_web_page_preview': str(settings.get('disable_web_page_preview', False)).lower(),
+            'disable_notification': str(settings.get('disable_notification', False)).lower()
+        }
+        bucket = self.bucket(chat_id)
+        error = None
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            try:
+                async with session.post(url, data=data, timeout=self.client_timeout) as response:
+                    if response.status == 200:
+                        return True, None
+                    body = await response.text()
+                    error = f"{response.status} - {body}"
+                    if response.status == 429:
+                        # Telegram сам каже, скільки чекати
+                        try:
+                            retry_after = (await response.json(content_type=None))['parameters']['retry_after']
+                        except Exception:
+                            retry_after = self.backoff(attempt)
+                        logging.warning(f"Telegram rate limit for {chat_id}, retry after {retry_after}s")
+                        bucket.block(retry_after)
+                        continue
+                    if response.status < 500:
+                        # Помилка в самому запиті - повтор не допоможе
+                        return False, error
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+            if attempt < self.max_retries:
+                delay = self.backoff(attempt)
+                logging.warning(f"Telegram send retry {attempt + 1} in {delay:.1f}s: {error}")
+                await asyncio.sleep(delay)
+        return False, error
+
+    async def _chat_worker(self, session, chat_id, queue, results):
+        # Повідомлення в один чат ідуть по черзі, щоб зберегти порядок
+        while not queue.empty():
+            index, text, message_settings, enqueued = queue.get_nowait()
+            started = time.monotonic()
+            ok, error = await self.send(session, chat_id, text, message_settings)
+            finished = time.monotonic()
+            results[index] = {
+                'ok': ok,
+                'error': error,
+                'latency': round(finished - enqueued, 3),
+                'send_time': round(finished - started, 3)
+            }
+            if ok:
+                logging.info(f"Message sent to {chat_id} in {results[index]['latency']:.2f}s")
+            else:
+                logging.error(f"❌ Помилка надсилання в {chat_id}: {error}")
+
+    async def deliver(self, messages, session=None, timeout=None):
+        """Доставляє [(chat_id, text) або (chat_id, text, message_settings), ...];
+        повертає результати в тому ж порядку. Через timeout секунд недоставлене
+        скасовується і отримує помилку 'deadline'"""
+        queues = {}
+        enqueued = time.monotonic()
+        for index, (chat_id, text, *message_settings) in enumerate(messages):
+            queues.setdefault(chat_id, asyncio.Queue()).put_nowait(
+                (index, text, message_settings[0] if message_settings else None, enqueued))
+
+        results = [None] * len(messages)
+        own_session = session is None
+        if own_session:
+            session = aiohttp.ClientSession(timeout=self.client_timeout)
+        try:
+            await asyncio.wait_for(asyncio.gather(*[self._chat_worker(session, chat_id, queue, results)
+                                                    for chat_id, queue in queues.items()]), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Delivery deadline: {results.count(None)} of {len(messages)} messages not sent")
+        finally:
+            if own_session:
+                await session.close()
+        # Черги надсилають у порядку повідомлень, тож до дедлайну встигають перші (найкращі)
+        return [result or {'ok': False, 'error': 'deadline', 'latency': None, 'send_time': None}
+                for result in results]
@@ -3,9 +3,9 @@
 
 import sys
 import os
-sys.path.append('/home/ubuntu/ai_news_system')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from ai_news_monitor import AINewsMonitor
+from ai_news_monitor import AINewsMonitor, setup_logging
 import logging
 
 def test_monitor():
@@ -42,6 +42,7 @@ def test_monitor():
             # Тестуємо переклад та форматування
             print("\n🌍 Тестую переклад та форматування...")
             test_news = filtered_news[0]
+            monitor.translate_news([test_news])
             message = monitor.format_news_message(test_news)
             
             print("📝 Приклад відформатованого повідомлення:")
@@ -58,7 +59,7 @@ def test_monitor():
             if response.lower() == 'y':
                 if monitor.send_to_telegram(message):
                     print("✅ Тестове повідомлення надіслано успішно!")
-                    monitor.sent_news.append(test_news['hash'])
+                    monitor.sent_news.add(test_news['hash'])
                     monitor.save_sent_news()
                 else:
                     print("❌ Помилка надсилання тестового повідомлення")
@@ -72,4 +73,5 @@ def test_monitor():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    setup_logging()
     test_monitor()
\ No newline at end of file
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from near_duplicates import NearDuplicateIndex, collapse_clusters
+
+BODY = ("The company published a detailed post describing the model architecture, the training data, "
+        "safety evaluations and the pricing for developers who use the API in production workloads.")
+
+
+def make_news(title, content='', source='openai.com'):
+    return {'title': title, 'content': content, 'source': source, 'url': f"https://{source}/{title}"}
+
+
+def make_index():
+    return NearDuplicateIndex({}, os.path.join(tempfile.mkdtemp(), 'near_duplicates.json'))
+
+
+def test_version_change_is_new_news():
+    """Заголовки, що відрізняються лише версією, - різні новини"""
+    for old, new in [("OpenAI releases GPT-4", "OpenAI releases GPT-5"),
+                     ("Meta releases Llama 3", "Meta releases Llama 4"),
+                     ("OpenAI releases GPT-4 with improved reasoning and coding abilities for developers",
+                      "OpenAI releases GPT-5 with improved reasoning and coding abilities for developers")]:
+        index = make_index()
+        index.add(make_news(old))
+        assert not index.seen_before(index.signatures(make_news(new))), new
+        assert len(collapse_clusters([make_news(old), make_news(new)], index)) == 2, new
+
+
+def test_same_story_is_duplicate():
+    """Та сама новина з іншого джерела лишається дублікатом"""
+    index = make_index()
+    index.add(make_news("OpenAI releases GPT-5", BODY))
+    assert index.seen_before(index.signatures(make_news("OpenAI releases GPT-5", BODY, 'reddit-OpenAI')))
+    assert index.seen_before(index.signatures(make_news("GPT-5 is here", BODY)))
+
+
+def test_reused_title_with_new_body_is_new_news():
+    """Дайджест з тим самим заголовком, але новим змістом, - нова новина"""
+    other = ("Researchers shared benchmark results for robotics agents trained in simulation, along with "
+             "open datasets, grasping demos and a roadmap for warehouse deployments next spring.")
+    index = make_index()
+    index.add(make_news("This week in AI", BODY))
+    assert not index.seen_before(index.signatures(make_news("This week in AI", other)))
+    assert index.seen_before(index.signatures(make_news("This week in AI", BODY)))
+
+
+def test_index_survives_reload():
+    index = make_index()
+    index.add(make_news("Meta releases Llama 3"))
+    index.save()
+    reloaded = NearDuplicateIndex({}, index.index_file)
+    assert reloaded.seen_before(reloaded.signatures(make_news("Meta releases Llama 3")))
+    assert not reloaded.seen_before(reloaded.signatures(make_news("Meta releases Llama 4")))
+
+
+if __name__ == "__main__":
+    test_version_change_is_new_news()
+    test_same_story_is_duplicate()
+    test_reused_title_with_new_body_is_new_news()
+    test_index_survives_reload()
+    print("✅ Near-duplicate tests passed")
@@ -3,9 +3,9 @@
 
 import sys
 import os
-sys.path.append('/home/ubuntu/ai_news_system')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from ai_news_monitor import AINewsMonitor
+from ai_news_monitor import AINewsMonitor, setup_logging
 import json
 
 def test_individual_sources():
@@ -74,4 +74,5 @@ def main():
         print("Невірний вибір")
 
 if __name__ == "__main__":
+    setup_logging()
     main()
\ No newline at end of file
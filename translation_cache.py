@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+
+
+def normalize_text(text):
+    """Нормалізуємо текст, щоб відмінності в пробілах не давали нових ключів"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class TranslationCache:
+    """Дисковий кеш перекладів з LRU-витісненням за кількістю та розміром"""
+
+    def __init__(self, settings=None, db_file='./data/translation_cache.db'):
+        settings = settings or {}
+        self.max_entries = settings.get('max_entries', 5000)
+        self.max_bytes = settings.get('max_megabytes', 20) * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        # Базу можуть відкрити кілька процесів (запуски, що перекрились): WAL і очікування блокування
+        self.conn = sqlite3.connect(db_file, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+        self.conn.commit()
+
+    def make_key(self, text, model, prompt, temperature):
+        """Ключ - хеш нормалізованого тексту разом з усіма параметрами запиту"""
+        payload = json.dumps([normalize_text(text), model, prompt, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        row = self.conn.execute("SELECT value FROM translations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        return row[0]
+
+    def put(self, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+            (key, value, len(value.encode('utf-8')), time.time())
+        )
+        self.conn.commit()
+
+    def evict(self):
+        """Видаляємо найдавніше використані записи понад ліміти"""
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM translations").fetchone()
+        evicted = 0
+        rows = self.conn.execute("SELECT key, size FROM translations ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        self.conn.commit()
+        # Переносимо WAL у файл бази: в артефакт потрапляє лише translation_cache.db
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return evicted
+
+    def log_stats(self):
+        requests = self.hits + self.misses
+        hit_rate = self.hits / requests * 100 if requests else 0
+        logging.info(f"Translation cache: {self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate)")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+import logging
+import asyncio
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import aiohttp
+
+from rate_limit import ConcurrencyLimit
+
+# Параметри, що не змінюють сторінку, а лише відстежують перехід
+TRACKING_PARAMS = {'ref', 'ref_src', 'ref_url', 'fbclid', 'gclid', 'dclid', 'mc_cid', 'mc_eid',
+                   'igshid', 'yclid', '_hsenc', '_hsmi', 'spm', 'cmpid'}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# Скорочувачі посилань - єдині хости, для яких редиректи з'ясовуємо окремим запитом
+SHORTENER_HOSTS = ['t.co', 'bit.ly', 'buff.ly', 'goo.gl', 'ow.ly', 'lnkd.in', 'tinyurl.com', 'redd.it', 'dlvr.it']
+
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url, force_https=True):
+    """Канонічна форма URL без мережі: схема і хост у нижньому регістрі, https,
+    без порту за замовчуванням, фрагмента, параметрів відстеження та кінцевого '/'
+
+    Це ключ для хешів і кешів, а не адреса для відкриття: сервер може не знати https
+    чи розрізняти кінцевий '/' і порядок параметрів.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url
+    host = (parts.hostname or '').rstrip('.')
+    if not host:
+        return url
+    if force_https:
+        scheme = 'https'
+    netloc = host
+    if parts.port and str(parts.port) not in DEFAULT_PORTS.values():
+        netloc = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    while '//' in path:
+        path = path.replace('//', '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not is_tracking_param(name)]
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ''))
+
+
+class UrlCanonicalizer:
+    """Канонічні URL з урахуванням відомих редиректів (збережена мапа з TTL)"""
+
+    def __init__(self, settings=None, map_file='./data/redirect_map.json'):
+        settings = settings or {}
+        self.map_file = map_file
+        self.force_https = settings.get('force_https', True)
+        self.resolve_redirects = settings.get('resolve_redirects', True)
+        self.redirect_hosts = set(settings.get('redirect_hosts', SHORTENER_HOSTS))
+        self.ttl = settings.get('redirect_ttl_days', 30) * 86400
+        self.timeout = settings.get('timeout', 10)
+        self.max_concurrency = settings.get('max_concurrency', 10)
+        self.client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        self.redirects = self.load()
+
+    def load(self):
+        """Завантажуємо мапу редиректів"""
+        if not os.path.exists(self.map_file):
+            return {}
+        try:
+            with open(self.map_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.map_file}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігаємо мапу, відкидаючи прострочені записи"""
+        now = time.time()
+        self.redirects = {url: entry for url, entry in self.redirects.items()
+                          if now - entry['checked_at'] < self.ttl}
+        tmp_file = f"{self.map_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.redirects, f, separators=(',', ':'))
+        os.replace(tmp_file, self.map_file)
+
+    def normalize(self, url):
+        return normalize_url(url, self.force_https)
+
+    def canonical(self, url):
+        """Нормалізований URL, замінений на ціль редиректу, якщо вона відома"""
+        url = self.normalize(url)
+        entry = self.redirects.get(url)
+        if entry and time.time() - entry['checked_at'] < self.ttl:
+            return entry['target']
+        return url
+
+    def resolve(self, url):
+        """Адреса для перевірки та доставки: як зібрано або кінцева адреса відомого редиректу
+        без нормалізації (на https переходимо, лише якщо туди веде сам редирект)"""
+        entry = self.redirects.get(self.normalize(url))
+        if entry and entry.get('url') and time.time() - entry['checked_at'] < self.ttl:
+            return entry['url']
+        return url
+
+    def record(self, source_url, target_url):
+        """Запам'ятовуємо редирект (звідки -> куди): канонічну ціль і адресу, як її віддав сервер"""
+        source = self.normalize(source_url)
+        target = self.normalize(target_url)
+        if source == target:
+            return
+        # Редирект на головну сторінку зазвичай означає "сторінки немає", а не нову адресу
+        if urlsplit(target).path == '/' and urlsplit(source).path != '/':
+            return
+        self.redirects[source] = {'target': target, 'url': target_url.strip(), 'checked_at': time.time()}
+
+    def needs_resolving(self, url):
+        url = self.normalize(url)
+        return (self.resolve_redirects and urlsplit(url).hostname in self.redirect_hosts
+                and url not in self.redirects)
+
+    async def _resolve(self, session, url, limit):
+        try:
+            async with limit.slot(url):
+                async with session.head(url, allow_redirects=True, timeout=self.client_timeout) as response:
+                    if response.status < 400:
+                        self.record(url, str(response.url))
+        except Exception as e:
+            logging.debug(f"Redirect resolve failed {url}: {e}")
+
+    async def resolve_many(self, urls, session=None):
+        """Розкриваємо скорочені посилання одним пулом з'єднань (спільним, якщо передано session)"""
+        pending = [url for url in dict.fromkeys(urls) if self.needs_resolving(url)]
+        if not pending:
+            return
+        logging.info(f"Resolving {len(pending)} redirects")
+        # max_concurrency діє і для переданої спільної сесії
+        limit = ConcurrencyLimit(self.max_concurrency)
+        if session is not None:
+            await asyncio.gather(*[self._resolve(session, url, limit) for url in pending])
+            return
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*[self._resolve(session, url, limit) for url in pending])
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+import logging
+import asyncio
+
+import aiohttp
+
+from rate_limit import ConcurrencyLimit
+
+
+class UrlValidator:
+    """Конкурентна перевірка посилань зі спільним пулом з'єднань та TTL-кешем"""
+
+    # Методи, на які сервери часто відповідають помилкою лише для HEAD
+    HEAD_UNSUPPORTED = (405, 501)
+
+    def __init__(self, settings=None, cache_file='./data/url_cache.json'):
+        settings = settings or {}
+        self.cache_file = cache_file
+        self.timeout = settings.get('timeout', 10)
+        self.max_concurrency = settings.get('max_concurrency', 20)
+        self.per_host = settings.get('per_host', 4)
+        self.ttl = settings.get('cache_ttl_hours', 24) * 3600
+        # Невдалі перевірки живуть менше - збій може бути тимчасовим
+        self.failure_ttl = settings.get('failure_ttl_hours', 1) * 3600
+        # Таймаут рахуємо без часу очікування вільного з'єднання в пулі
+        self.client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        self._http_session = None
+        self.cache = self.load_cache()
+        # Редиректи, помічені під час перевірки: {url: кінцевий url}
+        self.redirects = {}
+        self.cache_hits = 0
+        self.checked = 0
+
+    @property
+    def http_session(self):
+        """Сесія для синхронної перевірки (check), створюється за потреби"""
+        if self._http_session is None:
+            import requests
+            self._http_session = requests.Session()
+        return self._http_session
+
+    def load_cache(self):
+        """Завантажуємо кеш результатів перевірки"""
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.cache_file}: {e}")
+            return {}
+
+    def save_cache(self):
+        """Зберігаємо кеш, відкидаючи прострочені записи"""
+        now = time.time()
+        self.cache = {url: entry for url, entry in self.cache.items()
+                      if self._is_fresh(entry, now)}
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, separators=(',', ':'))
+        os.replace(tmp_file, self.cache_file)
+
+    def _is_fresh(self, entry, now):
+        ttl = self.ttl if entry['ok'] else self.failure_ttl
+        return now - entry['checked_at'] < ttl
+
+    def get_cached(self, url):
+        """Повертає збережений результат або None, якщо його немає чи він застарів"""
+        entry = self.cache.get(url)
+        if entry and self._is_fresh(entry, time.time()):
+            return entry['ok']
+        return None
+
+    def remember(self, url, ok, final_url=None):
+        self.cache[url] = {'ok': ok, 'checked_at': time.time()}
+        if ok and final_url and final_url != url:
+            self.redirects[url] = final_url
+
+    def check(self, url, timeout=None):
+        """Синхронна перевірка одного посилання (з використанням кешу)"""
+        cached = self.get_cached(url)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        self.checked += 1
+        timeout = timeout or self.timeout
+        try:
+            response = self.http_session.head(url, timeout=timeout, allow_redirects=True)
+            if response.status_code not in self.HEAD_UNSUPPORTED:
+                ok = response.status_code < 400
+                self.remember(url, ok, response.url)
+                return ok
+        except Exception:
+            pass
+        try:
+            response = self.http_session.get(url, timeout=timeout, allow_redirects=True, stream=True)
+            ok = response.status_code < 400
+            final_url = response.url
+            response.close()
+        except Exception:
+            ok, final_url = False, None
+        self.remember(url, ok, final_url)
+        return ok
+
+    async def _check_async(self, session, url):
+        """Повертає (ok, кінцевий url після редиректів)"""
+        try:
+            async with session.head(url, allow_redirects=True, timeout=self.client_timeout) as response:
+                if response.status not in self.HEAD_UNSUPPORTED:
+                    return response.status < 400, str(response.url)
+        except Exception:
+            pass
+        try:
+            # Тіло не читаємо - нам потрібен лише статус
+            async with session.get(url, allow_redirects=True, timeout=self.client_timeout) as response:
+                return response.status < 400, str(response.url)
+        except Exception:
+            return False, None
+
+    async def validate_many(self, urls, session=None):
+        """Перевіряє всі посилання одночасно, повертає {url: bool}
+
+        session - спільна сесія (режим демона); без неї створюється власний пул з'єднань.
+        """
+        results = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            cached = self.get_cached(url)
+            if cached is None:
+                pending.append(url)
+            else:
+                results[url] = cached
+
+        self.cache_hits += len(results)
+        self.checked += len(pending)
+        logging.info(f"URL validation: {len(results)} cached, {len(pending)} to check")
+        if not pending:
+            return results
+
+        # Ліміти max_concurrency/per_host діють і для переданої спільної сесії
+        limit = ConcurrencyLimit(self.max_concurrency, self.per_host)
+
+        async def check(session, url):
+            async with limit.slot(url):
+                ok, final_url = await self._check_async(session, url)
+            # Запам'ятовуємо одразу: перевірене до скасування за дедлайном запуску не втрачається
+            self.remember(url, ok, final_url)
+            results[url] = ok
+
+        if session is not None:
+            await asyncio.gather(*[check(session, url) for url in pending])
+        else:
+            # Один пул з'єднань на всю перевірку
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                await asyncio.gather(*[check(session, url) for url in pending])
+        return results